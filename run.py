@@ -3,23 +3,76 @@
 Among Us IRL - Startup Script
 
 Usage:
-    python run.py              # Run server only (local development)
+    python run.py              # Run server only
+    python run.py --dev        # Run with auto-reload (local development)
     python run.py --tunnel     # Run with Cloudflare tunnel (public access)
 """
 
+import os
 import subprocess
 import sys
 import signal
 import time
 import argparse
+import urllib.request
+
+
+def wait_for_server(port, process, timeout=5.0):
+    """Poll /health until the server answers. Returns False on timeout or if it exited."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=0.2)
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
 
 
 def main():
     parser = argparse.ArgumentParser(description='Start Among Us IRL server')
     parser.add_argument('--tunnel', action='store_true', help='Start Cloudflare tunnel for public access')
     parser.add_argument('--port', type=int, default=8000, help='Port to run server on (default: 8000)')
+    parser.add_argument('--dev', action='store_true', help='Auto-reload on code changes (wipes games on every save)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of uvicorn worker processes (default: 1, see warning below)')
     args = parser.parse_args()
 
+    if args.dev and args.workers > 1:
+        parser.error('--dev and --workers cannot be combined')
+    if args.workers > 1:
+        # Games and WebSocket connections live in each process's memory, so players
+        # routed to different workers would not see the same game.
+        print('WARNING: game state is per-process; more than 1 worker only works '
+              'once GameStore/ws_manager are backed by shared storage.')
+
+    # Build the uvicorn command line
+    uvicorn_args = [
+        sys.executable, '-m', 'uvicorn',
+        'server.main:app',
+        '--host', '0.0.0.0',
+        '--port', str(args.port),
+    ]
+    # uvloop/httptools ship with uvicorn[standard]; uvloop has no Windows build
+    if sys.platform != 'win32':
+        uvicorn_args += ['--loop', 'uvloop']
+    uvicorn_args += ['--http', 'httptools', '--ws', 'websockets']
+    if args.dev:
+        uvicorn_args.append('--reload')
+    else:
+        uvicorn_args += ['--workers', str(args.workers)]
+
+    if not args.tunnel and sys.platform != 'win32':
+        # Nothing to supervise: replace this process with uvicorn so Ctrl+C and
+        # signals go straight to it and no idle parent stays resident
+        print(f'Starting server on port {args.port}...')
+        print(f'\nServer running at: http://localhost:{args.port}')
+        print('Add --tunnel flag to get a public URL for phones')
+        print('\nPress Ctrl+C to stop\n', flush=True)
+        os.execv(sys.executable, uvicorn_args)
+
     processes = []
 
     def cleanup(sig=None, frame=None):
@@ -37,17 +90,15 @@ def main():
 
     # Start FastAPI server
     print(f'Starting server on port {args.port}...')
-    server_process = subprocess.Popen([
-        sys.executable, '-m', 'uvicorn',
-        'server.main:app',
-        '--host', '0.0.0.0',
-        '--port', str(args.port),
-        '--reload'
-    ])
+    server_process = subprocess.Popen(uvicorn_args)
     processes.append(server_process)
 
     # Wait for server to start
-    time.sleep(2)
+    if not wait_for_server(args.port, server_process):
+        if server_process.poll() is not None:
+            print('ERROR: server exited during startup')
+            sys.exit(server_process.returncode or 1)
+        print('WARNING: server not answering /health yet, continuing anyway')
 
     if args.tunnel:
         print('Starting Cloudflare tunnel...')
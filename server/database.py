@@ -1,28 +1,42 @@
 """In-memory game storage with optional SQLite persistence."""
 
-from typing import Optional
+import time
+from typing import Iterable, Optional
 from .models import GameModel, PlayerModel, generate_game_code
 
+# Codes never handed out to random games (TEST is used by /api/test/join)
+RESERVED_GAME_CODES = frozenset({"TEST"})
+
 
 class GameStore:
     """In-memory store for active games."""
 
     def __init__(self):
         self.games: dict[str, GameModel] = {}  # code -> GameModel
+        # Codes in use plus RESERVED_GAME_CODES; create_game draws until it misses this set
+        self.reserved_codes: set[str] = set(RESERVED_GAME_CODES)
+        # session_token -> (GameModel, PlayerModel), kept in sync with games
+        self.session_index: dict[str, tuple[GameModel, PlayerModel]] = {}
+
+    def _add_player(self, game: GameModel, player: PlayerModel):
+        """Register a player in a game and in the session index."""
+        game.add_player(player)
+        self.session_index[player.session_token] = (game, player)
 
     def create_game(self, host_name: str) -> tuple[GameModel, PlayerModel]:
         """Create a new game and return the game and host player."""
         # Generate unique code
         code = generate_game_code()
-        while code in self.games:
+        while code in self.reserved_codes:
             code = generate_game_code()
+        self.reserved_codes.add(code)
 
         # Create game
         game = GameModel(code=code)
 
         # Create host player
         host = PlayerModel(name=host_name, is_host=True)
-        game.players[host.id] = host
+        self._add_player(game, host)
 
         # Store game
         self.games[code] = game
@@ -32,13 +46,13 @@ class GameStore:
     def create_game_with_code(self, host_name: str, code: str) -> tuple[GameModel, PlayerModel]:
         """Create a new game with a specific code (for testing)."""
         # Delete old game with this code if exists
-        if code in self.games:
-            del self.games[code]
+        self.delete_game(code)
 
         game = GameModel(code=code)
         host = PlayerModel(name=host_name, is_host=True)
-        game.players[host.id] = host
+        self._add_player(game, host)
         self.games[code] = game
+        self.reserved_codes.add(code)
         return game, host
 
     def get_game(self, code: str) -> Optional[GameModel]:
@@ -53,33 +67,45 @@ class GameStore:
 
         # Create player
         player = PlayerModel(name=player_name)
-        game.players[player.id] = player
+        self._add_player(game, player)
 
         return game, player
 
+    def remove_player(self, game: GameModel, player_id: str):
+        """Remove a player from a game and drop their session."""
+        player = game.remove_player(player_id)
+        if player:
+            self.session_index.pop(player.session_token, None)
+
     def get_player_by_session(self, session_token: str) -> Optional[tuple[GameModel, PlayerModel]]:
         """Find a player by session token across all games."""
-        for game in self.games.values():
-            player = game.get_player_by_session(session_token)
-            if player:
-                return game, player
-        return None
+        return self.session_index.get(session_token)
 
     def delete_game(self, code: str) -> bool:
         """Delete a game."""
-        if code in self.games:
-            del self.games[code]
-            return True
-        return False
-
-    def cleanup_empty_games(self):
-        """Remove games with no connected players."""
-        empty_codes = [
-            code for code, game in self.games.items()
-            if not any(p.connected for p in game.players.values())
+        game = self.games.pop(code, None)
+        if game is None:
+            return False
+        if code not in RESERVED_GAME_CODES:
+            self.reserved_codes.discard(code)
+        for player in game.players.values():
+            self.session_index.pop(player.session_token, None)
+        return True
+
+    def cleanup_stale_games(self, connected_codes: Iterable[str], max_idle: float) -> int:
+        """Remove games with no open connections that have been idle for max_idle seconds.
+
+        connected_codes are the games that currently have at least one WebSocket;
+        only the remaining games are inspected. Returns the number of games removed.
+        """
+        cutoff = time.monotonic() - max_idle
+        stale_codes = [
+            code for code in self.games.keys() - set(connected_codes)
+            if self.games[code].last_activity < cutoff
         ]
-        for code in empty_codes:
-            del self.games[code]
+        for code in stale_codes:
+            self.delete_game(code)
+        return len(stale_codes)
 
 
 # Global store instance
@@ -3,26 +3,80 @@
 A Progressive Web App for playing Among Us in real life.
 """
 
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from pathlib import Path
+import asyncio
+import logging
 import time
 
+from .database import game_store
 from .routes import lobby, game, meetings, abilities, sabotage, websocket
+from .services.ws_manager import ws_manager
 
 # Get the project root directory
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Abandoned games (no open WebSocket) are removed after this many idle seconds
+GAME_IDLE_TIMEOUT = 20 * 60
+GAME_CLEANUP_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+
+async def cleanup_stale_games_loop():
+    """Periodically remove games nobody is connected to anymore."""
+    while True:
+        await asyncio.sleep(GAME_CLEANUP_INTERVAL)
+        # One failed sweep must not end cleanup for the life of the process
+        try:
+            game_store.cleanup_stale_games(ws_manager.active_connections.keys(), GAME_IDLE_TIMEOUT)
+        except Exception:
+            logger.exception("Stale game cleanup failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.openapi()  # Build (and cache) the OpenAPI schema now rather than on the first /docs hit
+    cleanup_task = asyncio.create_task(cleanup_stale_games_loop())
+    yield
+    cleanup_task.cancel()
+
+
 app = FastAPI(
     title="Among Us IRL",
     description="Real-life Among Us game companion",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Cache-Control per static path prefix (first match wins). Icons never change in
+# place; the manifest is re-checked daily; everything else revalidates via ETag.
+STATIC_CACHE_CONTROL = (
+    ("icons/", "public, max-age=31536000, immutable"),
+    ("manifest.json", "public, max-age=86400"),
 )
 
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that adds Cache-Control headers from STATIC_CACHE_CONTROL."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        path = self.get_path(scope)
+        for prefix, cache_control in STATIC_CACHE_CONTROL:
+            if path.startswith(prefix):
+                response.headers["Cache-Control"] = cache_control
+                break
+        return response
+
+
 # Mount static files
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+app.mount("/static", CachedStaticFiles(directory=BASE_DIR / "static"), name="static")
 
 # Set up templates
 templates = Jinja2Templates(directory=BASE_DIR / "server" / "templates")
@@ -31,6 +85,19 @@ templates = Jinja2Templates(directory=BASE_DIR / "server" / "templates")
 CACHE_VERSION = str(int(time.time()))
 templates.env.globals["v"] = CACHE_VERSION
 
+# Rendered page bodies. Pages take no per-request data and the cache version
+# only changes on restart, so each template is rendered once per process.
+_rendered_pages: dict[str, bytes] = {}
+
+
+def render_page(name: str) -> HTMLResponse:
+    """Serve a template rendered once and cached."""
+    body = _rendered_pages.get(name)
+    if body is None:
+        body = _rendered_pages[name] = templates.get_template(name).render().encode()
+    return HTMLResponse(body)
+
+
 # Include API routes
 app.include_router(lobby.router)
 app.include_router(game.router)
@@ -41,47 +108,21 @@ app.include_router(websocket.router)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request):
+async def home():
     """Serve the home page."""
-    return templates.TemplateResponse("pages/home.html", {"request": request})
+    return render_page("pages/home.html")
 
 
 @app.get("/game/{code}", response_class=HTMLResponse)
-async def game_page(request: Request, code: str):
-    """Serve the game page."""
-    return templates.TemplateResponse("pages/game.html", {"request": request, "code": code})
-
-
-@app.get("/manifest.json")
-async def manifest():
-    """Serve the PWA manifest."""
-    return {
-        "name": "Among Us IRL",
-        "short_name": "Among Us",
-        "description": "Real-life Among Us game companion",
-        "start_url": "/",
-        "display": "standalone",
-        "background_color": "#1a1a2e",
-        "theme_color": "#e94560",
-        "icons": [
-            {
-                "src": "/static/icons/icon-192.png",
-                "sizes": "192x192",
-                "type": "image/png"
-            },
-            {
-                "src": "/static/icons/icon-512.png",
-                "sizes": "512x512",
-                "type": "image/png"
-            }
-        ]
-    }
+async def game_page(code: str):
+    """Serve the game page (the client reads the code from the URL)."""
+    return render_page("pages/game.html")
 
 
 @app.get("/test", response_class=HTMLResponse)
-async def test_page(request: Request):
+async def test_page():
     """Test mode: auto-create/join a game with code TEST for quick iteration."""
-    return templates.TemplateResponse("pages/test_redirect.html", {"request": request})
+    return render_page("pages/test_redirect.html")
 
 
 @app.get("/health")
@@ -1,29 +1,32 @@
 """Data models and enums for Among Us IRL."""
 
-from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field
+from enum import StrEnum
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from dataclasses import dataclass, field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-import uuid
-import random
+import asyncio
+import secrets
 import string
+import time
 
 
-class GameState(str, Enum):
+class GameState(StrEnum):
     LOBBY = "lobby"
     PLAYING = "playing"
     MEETING = "meeting"
     ENDED = "ended"
 
 
-class RoleCategory(str, Enum):
+class RoleCategory(StrEnum):
     """Category for win condition grouping."""
     CREW = "crew"
     IMPOSTOR = "impostor"
     NEUTRAL = "neutral"
 
 
-class Role(str, Enum):
+class Role(StrEnum):
     # Base roles
     CREWMATE = "Crewmate"
     IMPOSTOR = "Impostor"
@@ -81,69 +84,94 @@ ROLE_CATEGORIES = {
     Role.LOOKOUT: RoleCategory.CREW,
 }
 
+IMPOSTOR_ROLES = frozenset(r for r, c in ROLE_CATEGORIES.items() if c == RoleCategory.IMPOSTOR)
 
-class TaskStatus(str, Enum):
+# Roles impostors see as teammates: Minion stays hidden, Spy poses as one
+IMPOSTOR_VISIBLE_ROLES = (IMPOSTOR_ROLES - {Role.MINION}) | {Role.SPY}
+GUESSER_ROLES = frozenset({Role.NICE_GUESSER, Role.EVIL_GUESSER})
+# Impostor-aligned roles that can sabotage (everyone but Minion)
+SABOTAGE_ROLES = IMPOSTOR_ROLES - {Role.MINION}
+
+# Game states in which players can still die / tasks still count
+ACTIVE_GAME_STATES = frozenset({GameState.PLAYING, GameState.MEETING})
+
+
+class TaskStatus(StrEnum):
     PENDING = "pending"
     COMPLETED = "completed"
 
 
-class PlayerStatus(str, Enum):
+class PlayerStatus(StrEnum):
     ALIVE = "alive"
     DEAD = "dead"
 
 
-class SabotageType(str, Enum):
+class SabotageType(StrEnum):
     LIGHTS = "lights"      # No timer, persists after meeting
     REACTOR = "reactor"    # Timer countdown, needs 2 people to hold simultaneously
     O2 = "o2"              # Timer countdown, needs 2 switches collectively
     COMMS = "comms"        # Placeholder for future
 
 
-class SabotageState(str, Enum):
+class SabotageState(StrEnum):
     NONE = "none"
     ACTIVE = "active"
     RESOLVED = "resolved"
 
 
-# Default tasks from the original Discord bot
-DEFAULT_TASKS = [
+# Default tasks from the original Discord bot (shared by every new game - immutable)
+DEFAULT_TASKS: tuple[str, ...] = (
     "Books", "Bottle flip", "Cards", "Clean vent", "Code", "Coins",
     "Colors", "Cup stack", "Dice", "Files", "Folding", "Leaves",
     "Scooter", "Trashketball", "Water pong", "Wires"
-]
+)
+
+
+_GAME_CODE_ALPHABET = string.ascii_uppercase
+_GAME_CODE_LENGTH = 4
+_GAME_CODE_SPACE = len(_GAME_CODE_ALPHABET) ** _GAME_CODE_LENGTH
 
 
 def generate_game_code() -> str:
-    """Generate a 4-letter game code."""
-    return ''.join(random.choices(string.ascii_uppercase, k=4))
+    """Generate a 4-letter game code (one unbiased draw, split into base-26 digits)."""
+    n = secrets.randbelow(_GAME_CODE_SPACE)
+    letters = []
+    for _ in range(_GAME_CODE_LENGTH):
+        n, digit = divmod(n, len(_GAME_CODE_ALPHABET))
+        letters.append(_GAME_CODE_ALPHABET[digit])
+    return ''.join(letters)
 
 
 def generate_id() -> str:
-    """Generate a unique ID."""
-    return str(uuid.uuid4())
+    """Generate a unique ID (16 hex chars, only needs to be unique within a game)."""
+    return secrets.token_hex(8)
 
 
 def generate_session_token() -> str:
-    """Generate a secure session token."""
-    return str(uuid.uuid4())
+    """Generate a secure session token (32 URL-safe chars)."""
+    return secrets.token_urlsafe(24)
 
 
-# Pydantic models for API requests/responses
+# In-memory game state (plain slotted dataclasses - no validation on the hot path;
+# eq=False keeps identity equality/hashing instead of deep field-by-field compares)
 
-class TaskModel(BaseModel):
-    id: str = Field(default_factory=generate_id)
+@dataclass(slots=True, eq=False)
+class TaskModel:
     name: str
+    id: str = field(default_factory=generate_id)
     status: TaskStatus = TaskStatus.PENDING
     is_fake: bool = False
 
 
-class PlayerModel(BaseModel):
-    id: str = Field(default_factory=generate_id)
+@dataclass(slots=True, eq=False)
+class PlayerModel:
     name: str
-    session_token: str = Field(default_factory=generate_session_token)
+    id: str = field(default_factory=generate_id)
+    session_token: str = field(default_factory=generate_session_token)
     role: Optional[Role] = None
+    category: Optional[RoleCategory] = None  # ROLE_CATEGORIES[role], kept in sync by GameModel.set_role
     status: PlayerStatus = PlayerStatus.ALIVE
-    tasks: list[TaskModel] = Field(default_factory=list)
+    tasks: dict[str, TaskModel] = field(default_factory=dict)  # task_id -> TaskModel, in assignment order
     is_host: bool = False
     connected: bool = True
 
@@ -153,7 +181,7 @@ class PlayerModel(BaseModel):
     guesser_used_this_meeting: bool = False   # Guesser: has guessed this meeting
     swapper_targets: Optional[tuple[str, str]] = None  # Swapper: two player IDs to swap votes
     vulture_bodies_eaten: int = 0             # Vulture: corpses consumed
-    vulture_eaten_body_ids: list[str] = Field(default_factory=list)  # IDs of bodies already eaten
+    vulture_eaten_body_ids: set[str] = field(default_factory=set)  # IDs of bodies already eaten
     bounty_target_id: Optional[str] = None    # Bounty Hunter: current target player ID
     bounty_kills: int = 0                     # Bounty Hunter: successful bounty kills (reduces cooldown)
     noise_maker_target_id: Optional[str] = None  # Noise Maker: who will "find" them
@@ -162,12 +190,42 @@ class PlayerModel(BaseModel):
 
 
 class RoleConfig(BaseModel):
-    """Configuration for probability-based role selection."""
+    """Configuration for probability-based role selection (frozen - replace, don't mutate)."""
+    model_config = ConfigDict(frozen=True)
+
     enabled: bool = False
     probability: int = 100  # 0-100% chance when enabled
     max_count: int = 1      # Maximum players with this role
 
 
+# Shared by every game until the host changes a role's config
+DEFAULT_ROLE_CONFIG = RoleConfig()
+
+# role_configs keys, in display order
+ROLE_CONFIG_KEYS = (
+    # Crewmate variants
+    "sheriff", "engineer", "captain", "mayor", "nice_guesser", "spy", "swapper", "lookout",
+    # Impostor variants
+    "evil_guesser", "bounty_hunter", "cleaner", "venter", "minion",
+    # Neutral roles
+    "jester", "lone_wolf", "vulture", "noise_maker", "executioner",
+)
+
+
+class SabotageConfig(NamedTuple):
+    """One sabotage slot's settings (stored flat as sabotage_N_* on GameSettings)."""
+    enabled: bool
+    name: str
+    type: str
+    timer: int
+
+
+SABOTAGE_SLOTS = (1, 2, 3, 4)
+_SABOTAGE_FIELDS = {
+    i: tuple(f"sabotage_{i}_{f}" for f in SabotageConfig._fields) for i in SABOTAGE_SLOTS
+}
+
+
 class GameSettings(BaseModel):
     tasks_per_player: int = 5
     num_impostors: int = 1
@@ -179,29 +237,9 @@ class GameSettings(BaseModel):
     enable_minion: bool = False
     enable_sheriff: bool = False
     # Role configs: enabled = in the pool for random selection
-    role_configs: dict[str, RoleConfig] = Field(default_factory=lambda: {
-        # Crewmate variants
-        "sheriff": RoleConfig(),
-        "engineer": RoleConfig(),
-        "captain": RoleConfig(),
-        "mayor": RoleConfig(),
-        "nice_guesser": RoleConfig(),
-        "spy": RoleConfig(),
-        "swapper": RoleConfig(),
-        "lookout": RoleConfig(),
-        # Impostor variants
-        "evil_guesser": RoleConfig(),
-        "bounty_hunter": RoleConfig(),
-        "cleaner": RoleConfig(),
-        "venter": RoleConfig(),
-        "minion": RoleConfig(),
-        # Neutral roles
-        "jester": RoleConfig(),
-        "lone_wolf": RoleConfig(),
-        "vulture": RoleConfig(),
-        "noise_maker": RoleConfig(),
-        "executioner": RoleConfig(),
-    })
+    role_configs: dict[str, RoleConfig] = Field(
+        default_factory=lambda: dict.fromkeys(ROLE_CONFIG_KEYS, DEFAULT_ROLE_CONFIG)
+    )
     # Per-character cooldown settings (in seconds)
     kill_cooldown: int = 45  # Legacy, kept for backwards compat
     impostor_kill_cooldown: int = 45
@@ -250,107 +288,221 @@ class GameSettings(BaseModel):
     # Post-vote results timer
     vote_results_duration: int = 5     # Seconds to show results before END MEETING appears (5-30)
 
+    def get_sabotage(self, index: int) -> SabotageConfig:
+        """Get the settings for sabotage slot `index` (one of SABOTAGE_SLOTS)."""
+        return SabotageConfig(*[getattr(self, attr) for attr in _SABOTAGE_FIELDS[index]])
 
-class ActiveSabotage(BaseModel):
+    def set_role_enabled(self, role_key: str, enabled: bool):
+        """Enable/disable a role in the pool (replaces the shared frozen RoleConfig)."""
+        self.role_configs[role_key] = self.role_configs[role_key].model_copy(update={"enabled": enabled})
+
+
+_DEFAULT_SETTINGS = GameSettings()
+
+
+def make_settings() -> GameSettings:
+    """New default settings, copied from a prebuilt template instead of re-validated.
+
+    model_copy is shallow, so role_configs gets its own dict (its RoleConfig values are frozen).
+    """
+    return _DEFAULT_SETTINGS.model_copy(update={"role_configs": dict(_DEFAULT_SETTINGS.role_configs)})
+
+
+@dataclass(slots=True, eq=False)
+class ActiveSabotage:
     """Represents an active sabotage in progress."""
     index: int  # Which sabotage (1-4)
     type: str  # lights, reactor, o2
     name: str
     timer: int  # 0 for no timer
-    started_at: float  # timestamp
+    started_at: float  # time.monotonic()
     started_by: str  # player_id
     # For reactor: need 2 people holding simultaneously
-    reactor_holders: list[str] = []  # player_ids currently holding
+    reactor_holders: set[str] = field(default_factory=set)  # player_ids currently holding
     # For O2: need 2 switches
     o2_switches: int = 0  # count of switches flipped
 
 
-class VoteType(str, Enum):
+class VoteType(StrEnum):
     PLAYER = "player"  # Vote to eliminate a player
     SKIP = "skip"      # Skip voting
 
 
-class Vote(BaseModel):
-    """A single vote cast during a meeting."""
+class Vote(NamedTuple):
+    """A single vote cast during a meeting (immutable - a voter can't change their vote)."""
     voter_id: str
     target_id: Optional[str] = None  # None if skip vote
     vote_type: VoteType = VoteType.SKIP
     timestamp: float = 0.0
 
 
-class MeetingState(BaseModel):
+@dataclass(slots=True, eq=False)
+class MeetingState:
     """Tracks state of an active meeting."""
-    started_at: float
+    started_at: float  # time.monotonic()
     started_by: str  # player_id who called meeting
     started_by_name: str = ""  # caller name for display
     meeting_type: str = "meeting"  # "meeting" or "body_report"
     phase: str = "gathering"  # "gathering", "voting", or "results"
-    votes: dict[str, Vote] = Field(default_factory=dict)  # voter_id -> Vote
+    votes: dict[str, Vote] = field(default_factory=dict)  # voter_id -> Vote
     voting_ended: bool = False
     result: Optional[dict] = None  # Stores vote counts and outcome
-    # Timestamps for server-side validation
+    # time.monotonic() deadlines for server-side validation (clients get remaining seconds)
     discussion_end_time: Optional[float] = None  # When discussion period ends
     voting_end_time: Optional[float] = None      # When voting timer expires
 
 
-class GameModel(BaseModel):
-    id: str = Field(default_factory=generate_id)
-    code: str = Field(default_factory=generate_game_code)
+@dataclass(slots=True, eq=False)
+class GameModel:
+    id: str = field(default_factory=generate_id)
+    code: str = field(default_factory=generate_game_code)
     state: GameState = GameState.LOBBY
-    settings: GameSettings = Field(default_factory=GameSettings)
-    players: dict[str, PlayerModel] = Field(default_factory=dict)
-    available_tasks: list[str] = Field(default_factory=lambda: DEFAULT_TASKS.copy())
+    settings: GameSettings = field(default_factory=make_settings)
+    players: dict[str, PlayerModel] = field(default_factory=dict)
+    available_tasks: tuple[str, ...] = DEFAULT_TASKS  # Replaced (never mutated) when tasks are added/removed
     crewmate_task_total: int = 0
+    crewmate_tasks_completed: int = 0  # Running count, updated by complete/uncomplete_task
     winner: Optional[str] = None
     # Sabotage state
     active_sabotage: Optional[ActiveSabotage] = None
-    sabotage_cooldown_end: Optional[float] = None  # timestamp when cooldown ends
+    sabotage_cooldown_end: Optional[float] = None  # time.monotonic() when cooldown ends
     # Meeting/Voting state
     active_meeting: Optional[MeetingState] = None
     # Vulture: bodies that can no longer be eaten (discovered in meetings or voted out)
-    vulture_ineligible_body_ids: list[str] = Field(default_factory=list)
+    vulture_ineligible_body_ids: set[str] = field(default_factory=set)
     # Lookout: snapshot of alive player IDs at end of last meeting (for selection constraint)
-    alive_at_last_meeting: list[str] = Field(default_factory=list)
+    alive_at_last_meeting: list[str] = field(default_factory=list)
+    # time.monotonic() of the last WebSocket activity, used to expire abandoned games
+    last_activity: float = field(default_factory=time.monotonic)
+    # Serializes mutating requests for this game (see game_helpers.serialized_per_game)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    # Cached settings.model_dump(); cleared by settings_changed()
+    settings_cache: Optional[dict] = field(default=None, init=False, repr=False)
+    # Role reveal built once the game has ENDED (roles can't change after that), see get_all_roles
+    final_roles_cache: Optional[list[dict]] = field(default=None, init=False, repr=False)
+    # Alive/dead indexes (player_id -> PlayerModel), maintained by add_player/remove_player/mark_dead
+    alive_index: dict[str, PlayerModel] = field(default_factory=dict, init=False, repr=False)
+    dead_index: dict[str, PlayerModel] = field(default_factory=dict, init=False, repr=False)
+    # Alive players per role category (None before roles are dealt), kept in step with alive_index
+    alive_category_counts: dict[Optional[RoleCategory], int] = field(default_factory=dict, init=False, repr=False)
+    # Cached ({id, name} alive list, dead list) for meeting payloads; cleared when the indexes change
+    roster_cache: Optional[tuple[list[dict], list[dict]]] = field(default=None, init=False, repr=False)
+    # Cached public player lists (include_roles -> list); cleared by players_changed()
+    public_players_cache: dict[bool, list[dict]] = field(default_factory=dict, init=False, repr=False)
+    # Session token -> PlayerModel, maintained by add_player/remove_player
+    session_index: dict[str, PlayerModel] = field(default_factory=dict, init=False, repr=False)
+    # Role index (role -> player_id -> PlayerModel), maintained by set_role
+    role_index: dict[Role, dict[str, PlayerModel]] = field(default_factory=dict, init=False, repr=False)
 
     def get_task_completion_percentage(self) -> float:
         """Calculate task completion percentage (all crew-aligned roles)."""
         if self.crewmate_task_total == 0:
             return 0.0
-        completed = sum(
-            1 for p in self.players.values()
-            if p.role and ROLE_CATEGORIES.get(p.role) == RoleCategory.CREW
-            for t in p.tasks
-            if t.status == TaskStatus.COMPLETED
-        )
-        return round((completed / self.crewmate_task_total) * 100, 1)
+        return round((self.crewmate_tasks_completed / self.crewmate_task_total) * 100, 1)
+
+    def get_settings_payload(self) -> dict:
+        """Serialized settings (shared dict - do not mutate), cached until settings_changed()."""
+        if self.settings_cache is None:
+            self.settings_cache = self.settings.model_dump()
+        return self.settings_cache
+
+    def settings_changed(self):
+        """Invalidate the cached settings payload after mutating settings."""
+        self.settings_cache = None
+
+    def players_changed(self):
+        """Invalidate cached player payloads after a join/leave/death or connected/host change."""
+        self.roster_cache = None
+        self.public_players_cache.clear()
+
+    def add_player(self, player: PlayerModel):
+        """Add a player to the game and the session/alive/dead indexes."""
+        self.players[player.id] = player
+        self.session_index[player.session_token] = player
+        if player.status == PlayerStatus.ALIVE:
+            self.alive_index[player.id] = player
+            self._count_alive(player.category, 1)
+        else:
+            self.dead_index[player.id] = player
+        self.players_changed()
+
+    def remove_player(self, player_id: str) -> Optional[PlayerModel]:
+        """Remove a player from the game. Returns the removed player, if any."""
+        if player_id in self.alive_index:
+            self._count_alive(self.alive_index.pop(player_id).category, -1)
+        self.dead_index.pop(player_id, None)
+        self.players_changed()
+        player = self.players.pop(player_id, None)
+        if player:
+            self.session_index.pop(player.session_token, None)
+            if player.role in self.role_index:
+                self.role_index[player.role].pop(player_id, None)
+        return player
+
+    def set_role(self, player: PlayerModel, role: Role):
+        """Assign a player's role and keep their category and the role index in sync."""
+        if player.role in self.role_index:
+            self.role_index[player.role].pop(player.id, None)
+        player.role = role
+        if player.id in self.alive_index:
+            self._count_alive(player.category, -1)
+            self._count_alive(ROLE_CATEGORIES.get(role), 1)
+        player.category = ROLE_CATEGORIES.get(role)
+        self.role_index.setdefault(role, {})[player.id] = player
+
+    def get_players_with_role(self, role: Role) -> list[PlayerModel]:
+        """Get list of players (alive or dead) currently holding a role."""
+        return list(self.role_index.get(role, {}).values())
+
+    def mark_dead(self, player: PlayerModel):
+        """Set a player's status to dead and move them to the dead index."""
+        player.status = PlayerStatus.DEAD
+        if self.alive_index.pop(player.id, None) is not None:
+            self._count_alive(player.category, -1)
+        self.dead_index[player.id] = player
+        self.players_changed()
+
+    def _count_alive(self, category: Optional[RoleCategory], delta: int):
+        self.alive_category_counts[category] = self.alive_category_counts.get(category, 0) + delta
+
+    def count_alive_in(self, category: RoleCategory) -> int:
+        """Number of alive players in a role category (running count, no scan)."""
+        return self.alive_category_counts.get(category, 0)
 
     def get_alive_players(self) -> list[PlayerModel]:
         """Get list of alive players."""
-        return [p for p in self.players.values() if p.status == PlayerStatus.ALIVE]
+        return list(self.alive_index.values())
+
+    def count_alive(self) -> int:
+        """Number of alive players (no list allocation)."""
+        return len(self.alive_index)
 
     def get_dead_players(self) -> list[PlayerModel]:
-        """Get list of dead players."""
-        return [p for p in self.players.values() if p.status == PlayerStatus.DEAD]
+        """Get list of dead players (in order of death)."""
+        return list(self.dead_index.values())
 
     def get_player_by_session(self, session_token: str) -> Optional[PlayerModel]:
         """Find player by session token."""
-        for player in self.players.values():
-            if player.session_token == session_token:
-                return player
-        return None
+        return self.session_index.get(session_token)
 
 
-# API request/response models
+# Pydantic models for API requests/responses (read-only once parsed/built)
 
 class CreateGameRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     player_name: str
 
 
 class JoinGameRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     player_name: str
 
 
 class UpdateSettingsRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     tasks_per_player: Optional[int] = None
     num_impostors: Optional[int] = None
     num_neutrals: Optional[int] = None
@@ -399,10 +551,14 @@ class UpdateSettingsRequest(BaseModel):
 
 
 class AddTaskRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     task_name: str
 
 
 class GameResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     code: str
     state: GameState
     settings: GameSettings
@@ -412,14 +568,16 @@ class GameResponse(BaseModel):
 
 
 class PlayerResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
     session_token: str
     is_host: bool
 
 
-# Role descriptions for UI
-ROLE_DESCRIPTIONS = {
+# Role descriptions for UI (read-only view; the role-guide endpoint caches its JSON)
+ROLE_DESCRIPTIONS = MappingProxyType({
     # Base roles
     "crewmate": {
         "name": "Crewmate",
@@ -565,4 +723,13 @@ ROLE_DESCRIPTIONS = {
         "description": "Select a player to watch. If they are killed outside of a meeting, you get an alert. Use this to gather information.",
         "color": "#06b6d4"
     },
-}
+})
+
+# Role guide grouping, built once: category -> role keys in guide order (base roles, then ROLE_CONFIG_KEYS)
+ROLE_KEYS_BY_CATEGORY = MappingProxyType({
+    category: tuple(
+        key for key in ("crewmate", "impostor", *ROLE_CONFIG_KEYS)
+        if ROLE_DESCRIPTIONS[key]["category"] == category
+    )
+    for category in ("crew", "impostor", "neutral")
+})
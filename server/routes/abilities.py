@@ -2,29 +2,61 @@
 
 from fastapi import APIRouter, HTTPException
 from ..database import game_store
-from ..models import GameState, PlayerStatus, Role, MeetingState, Vote, VoteType, ROLE_CATEGORIES, RoleCategory
-import time
+from ..models import GameState, PlayerStatus, Role, Vote, VoteType, RoleCategory, GUESSER_ROLES
 from ..services.ws_manager import ws_manager
-from ..services.game_logic import check_win_conditions, get_role_info, reassign_bounty_target, get_all_roles
-from ..services.game_helpers import check_and_reassign_bounty_targets, check_executioner_fallback
+from ..services.game_logic import get_role_info, reassign_bounty_target, end_game
+from ..services.game_helpers import check_and_reassign_bounty_targets, check_executioner_fallback, open_meeting, broadcast_with_win_check, serialized_per_game
 
 router = APIRouter(prefix="/api", tags=["abilities"])
 
 
-@router.post("/games/{code}/ability/engineer-fix")
-async def engineer_fix_endpoint(code: str, session_token: str):
-    """Engineer: Fix active sabotage remotely (one use per game)."""
+# Who may use each ability: (roles, 403 detail if wrong role, required status, 400 detail otherwise)
+ABILITY_GATES = {
+    "engineer-fix": (frozenset({Role.ENGINEER}), "Not an Engineer", PlayerStatus.ALIVE, "You are dead"),
+    "captain-meeting": (frozenset({Role.CAPTAIN}), "Not a Captain", PlayerStatus.ALIVE, "You are dead"),
+    "guesser-guess": (GUESSER_ROLES, "Not a Guesser", PlayerStatus.ALIVE, "You are dead"),
+    "noise-maker-select": (frozenset({Role.NOISE_MAKER}), "Not a Noise Maker",
+                           PlayerStatus.DEAD, "You must be dead to use this ability"),
+    "vulture-eat": (frozenset({Role.VULTURE}), "Not a Vulture", PlayerStatus.ALIVE, "You are dead"),
+    "bounty-kill": (frozenset({Role.BOUNTY_HUNTER}), "Not a Bounty Hunter", PlayerStatus.ALIVE, "You are dead"),
+    "swapper-swap": (frozenset({Role.SWAPPER}), "Not a Swapper", PlayerStatus.ALIVE, "You are dead"),
+    "lookout-select": (frozenset({Role.LOOKOUT}), "Not a Lookout", PlayerStatus.ALIVE, "You are dead"),
+}
+
+
+def _ability_user(ability: str, session_token: str):
+    """Resolve the session and check the caller's role and status for an ability.
+
+    Returns (game, player); raises the same 404/403/400 errors each endpoint used to.
+    """
     result = game_store.get_player_by_session(session_token)
     if not result:
         raise HTTPException(status_code=404, detail="Session not found")
 
     game, player = result
+    roles, role_detail, status, status_detail = ABILITY_GATES[ability]
+    if player.role not in roles:
+        raise HTTPException(status_code=403, detail=role_detail)
+    if player.status != status:
+        raise HTTPException(status_code=400, detail=status_detail)
+    return game, player
 
-    if player.role != Role.ENGINEER:
-        raise HTTPException(status_code=403, detail="Not an Engineer")
 
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+def _require_alive(game, player_id: str, dead_detail: str, missing_detail: str = "Target not found"):
+    """Look up an ability target, raising 404 if missing or 400 if not alive."""
+    target = game.players.get(player_id)
+    if not target:
+        raise HTTPException(status_code=404, detail=missing_detail)
+    if target.status != PlayerStatus.ALIVE:
+        raise HTTPException(status_code=400, detail=dead_detail)
+    return target
+
+
+@router.post("/games/{code}/ability/engineer-fix")
+@serialized_per_game
+async def engineer_fix_endpoint(code: str, session_token: str):
+    """Engineer: Fix active sabotage remotely (one use per game)."""
+    game, player = _ability_user("engineer-fix", session_token)
 
     if player.engineer_fix_used:
         raise HTTPException(status_code=400, detail="Already used remote fix this game")
@@ -56,19 +88,10 @@ async def engineer_fix_endpoint(code: str, session_token: str):
 
 
 @router.post("/games/{code}/ability/captain-meeting")
+@serialized_per_game
 async def captain_meeting_endpoint(code: str, session_token: str):
     """Captain: Call a remote meeting from anywhere (one use per game)."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role != Role.CAPTAIN:
-        raise HTTPException(status_code=403, detail="Not a Captain")
-
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+    game, player = _ability_user("captain-meeting", session_token)
 
     if player.captain_meeting_used:
         raise HTTPException(status_code=400, detail="Already used remote meeting this game")
@@ -85,63 +108,17 @@ async def captain_meeting_endpoint(code: str, session_token: str):
     # Mark ability as used
     player.captain_meeting_used = True
 
-    # Mark all currently dead bodies as ineligible for vulture eating
-    for p in game.players.values():
-        if p.status == PlayerStatus.DEAD and p.id not in game.vulture_ineligible_body_ids:
-            game.vulture_ineligible_body_ids.append(p.id)
-
-    # Create meeting state (same as normal meeting)
-    game.active_meeting = MeetingState(
-        started_at=time.time(),
-        started_by=player.id,
-        started_by_name=player.name,
-        meeting_type="meeting",
-        phase="gathering"
-    )
-    game.state = GameState.MEETING
-
-    # Broadcast meeting with full payload (same as normal meeting)
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "meeting_called",
-        "payload": {
-            "called_by": player.name,
-            "caller_id": player.id,
-            "meeting_type": "meeting",
-            "phase": "gathering",
-            "task_percentage": game.get_task_completion_percentage(),
-            "alive_players": [
-                {"id": p.id, "name": p.name}
-                for p in game.get_alive_players()
-            ],
-            "dead_players": [
-                {"id": p.id, "name": p.name}
-                for p in game.get_dead_players()
-            ],
-            "enable_voting": game.settings.enable_voting,
-            "anonymous_voting": game.settings.anonymous_voting,
-            "timer_duration": game.settings.meeting_timer_duration,
-            "warning_time": game.settings.meeting_warning_time,
-            "discussion_time": game.settings.discussion_time
-        }
-    })
+    # Same meeting as a normal call, from anywhere
+    await open_meeting(game, player)
 
     return {"success": True}
 
 
 @router.post("/games/{code}/ability/guesser-guess")
+@serialized_per_game
 async def guesser_guess_endpoint(code: str, session_token: str, target_id: str, guessed_role: str):
     """Guesser: Guess a player's role during meeting. Wrong = you die."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role not in [Role.NICE_GUESSER, Role.EVIL_GUESSER]:
-        raise HTTPException(status_code=403, detail="Not a Guesser")
-
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+    game, player = _ability_user("guesser-guess", session_token)
 
     if game.state != GameState.MEETING:
         raise HTTPException(status_code=400, detail="Can only guess during meetings")
@@ -149,12 +126,7 @@ async def guesser_guess_endpoint(code: str, session_token: str, target_id: str,
     if player.guesser_used_this_meeting:
         raise HTTPException(status_code=400, detail="Already guessed wrong this meeting")
 
-    target = game.players.get(target_id)
-    if not target:
-        raise HTTPException(status_code=404, detail="Target not found")
-
-    if target.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="Target is already dead")
+    target = _require_alive(game, target_id, "Target is already dead")
 
     # Check if guess is correct
     try:
@@ -164,27 +136,27 @@ async def guesser_guess_endpoint(code: str, session_token: str, target_id: str,
 
     # Crew guesser (Bounty Hunter): "Impostor" guess matches ANY impostor-category role
     if player.role == Role.NICE_GUESSER and guessed == Role.IMPOSTOR:
-        is_correct = ROLE_CATEGORIES.get(target.role) == RoleCategory.IMPOSTOR
+        is_correct = target.category == RoleCategory.IMPOSTOR
     else:
         is_correct = target.role == guessed
 
     if is_correct:
         # Correct! Target dies. Guesser can keep guessing.
-        target.status = PlayerStatus.DEAD
+        game.mark_dead(target)
         dead_player = target
         guesser_survived = True
         message = f"{target.name} has been eliminated."
     else:
         # Wrong! Guesser dies. Mark as used so they can't guess again.
         player.guesser_used_this_meeting = True
-        player.status = PlayerStatus.DEAD
+        game.mark_dead(player)
         dead_player = player
         guesser_survived = False
         message = f"{player.name} has been eliminated."
 
     # Scrub dead player's vote if they already voted
-    if game.active_meeting and dead_player.id in game.active_meeting.votes:
-        del game.active_meeting.votes[dead_player.id]
+    if game.active_meeting:
+        game.active_meeting.votes.pop(dead_player.id, None)
 
     # Auto-reassign bounty targets if the dead player was someone's target
     await check_and_reassign_bounty_targets(game, dead_player.id)
@@ -192,11 +164,11 @@ async def guesser_guess_endpoint(code: str, session_token: str, target_id: str,
     await check_executioner_fallback(game, dead_player.id)
 
     # Calculate updated vote counts
-    alive_count = sum(1 for p in game.players.values() if p.status == PlayerStatus.ALIVE)
+    alive_count = game.count_alive()
     votes_cast = len(game.active_meeting.votes) if game.active_meeting else 0
 
-    # Broadcast result
-    await ws_manager.broadcast_to_game(game.code, {
+    # Broadcast result (and the game result, if this decided it)
+    await broadcast_with_win_check(game, {
         "type": "guesser_result",
         "payload": {
             "guesser_name": player.name,
@@ -213,37 +185,14 @@ async def guesser_guess_endpoint(code: str, session_token: str, target_id: str,
         }
     })
 
-    # Check win conditions
-    winner = check_win_conditions(game)
-    if winner:
-        game.state = GameState.ENDED
-        game.winner = winner
-        game.active_sabotage = None
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "game_ended",
-            "payload": {
-                "winner": winner,
-                "roles": get_all_roles(game)
-            }
-        })
-
     return {"success": True, "correct": guesser_survived, "message": message}
 
 
 @router.post("/games/{code}/ability/noise-maker-select")
+@serialized_per_game
 async def noise_maker_select_endpoint(code: str, session_token: str, target_player_id: str):
     """Noise Maker: Select who 'finds' your body. Triggers a body report meeting on that player."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role != Role.NOISE_MAKER:
-        raise HTTPException(status_code=403, detail="Not a Noise Maker")
-
-    if player.status != PlayerStatus.DEAD:
-        raise HTTPException(status_code=400, detail="You must be dead to use this ability")
+    game, player = _ability_user("noise-maker-select", session_token)
 
     if game.state != GameState.PLAYING:
         raise HTTPException(status_code=400, detail="Can only use during gameplay")
@@ -251,67 +200,22 @@ async def noise_maker_select_endpoint(code: str, session_token: str, target_play
     if game.active_meeting:
         raise HTTPException(status_code=400, detail="Meeting already in progress")
 
-    target = game.players.get(target_player_id)
-    if not target:
-        raise HTTPException(status_code=404, detail="Target not found")
-
-    if target.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="Target must be alive")
+    target = _require_alive(game, target_player_id, "Target must be alive")
 
     # Store the target selection
     player.noise_maker_target_id = target_player_id
 
     # Trigger a body report meeting with the target as the "caller"
-    # Mark all currently dead bodies as ineligible for vulture eating
-    for p in game.players.values():
-        if p.status == PlayerStatus.DEAD and p.id not in game.vulture_ineligible_body_ids:
-            game.vulture_ineligible_body_ids.append(p.id)
-
-    game.state = GameState.MEETING
-    game.active_meeting = MeetingState(
-        started_at=time.time(),
-        started_by=target.id,
-        started_by_name=target.name,
-        meeting_type="body_report"
-    )
-
-    alive_players = [{"id": p.id, "name": p.name} for p in game.get_alive_players()]
-    dead_players = [{"id": p.id, "name": p.name} for p in game.get_dead_players()]
-
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "meeting_called",
-        "payload": {
-            "caller_id": target.id,
-            "called_by": target.name,
-            "meeting_type": "body_report",
-            "phase": "gathering",
-            "task_percentage": game.get_task_completion_percentage(),
-            "alive_players": alive_players,
-            "dead_players": dead_players,
-            "enable_voting": game.settings.enable_voting,
-            "anonymous_voting": game.settings.anonymous_voting,
-            "timer_duration": game.settings.meeting_timer_duration,
-            "warning_time": game.settings.meeting_warning_time
-        }
-    })
+    await open_meeting(game, target, "body_report")
 
     return {"success": True}
 
 
 @router.post("/games/{code}/ability/vulture-eat")
+@serialized_per_game
 async def vulture_eat_endpoint(code: str, session_token: str, body_player_id: str):
     """Vulture: Eat a dead body to work toward win condition."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role != Role.VULTURE:
-        raise HTTPException(status_code=403, detail="Not a Vulture")
-
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+    game, player = _ability_user("vulture-eat", session_token)
 
     if game.state != GameState.PLAYING:
         raise HTTPException(status_code=400, detail="Cannot eat bodies now")
@@ -332,7 +236,7 @@ async def vulture_eat_endpoint(code: str, session_token: str, body_player_id: st
         raise HTTPException(status_code=400, detail="This body is no longer available")
 
     # Eat the body
-    player.vulture_eaten_body_ids.append(body_player_id)
+    player.vulture_eaten_body_ids.add(body_player_id)
     player.vulture_bodies_eaten += 1
     bodies_needed = game.settings.vulture_eat_count
 
@@ -346,17 +250,9 @@ async def vulture_eat_endpoint(code: str, session_token: str, body_player_id: st
 
     # Check vulture win condition
     if player.vulture_bodies_eaten >= bodies_needed:
-        game.state = GameState.ENDED
-        game.winner = "Vulture"
-        game.active_sabotage = None  # Clear any active sabotage
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "game_ended",
-            "payload": {
-                "winner": "Vulture",
-                "reason": f"{player.name} ate enough bodies!",
-                "roles": get_all_roles(game)
-            }
-        })
+        await ws_manager.broadcast_to_game(
+            game.code, end_game(game, "Vulture", f"{player.name} ate enough bodies!")
+        )
         return {"success": True, "vulture_wins": True, "bodies_eaten": player.vulture_bodies_eaten, "bodies_needed": bodies_needed}
 
     return {
@@ -367,19 +263,10 @@ async def vulture_eat_endpoint(code: str, session_token: str, body_player_id: st
 
 
 @router.post("/games/{code}/ability/bounty-kill")
+@serialized_per_game
 async def bounty_kill_endpoint(code: str, session_token: str, claimed: bool = True):
     """Rampager: Handle bounty target death. If claimed, increment kill count. Always reassigns target."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role != Role.BOUNTY_HUNTER:
-        raise HTTPException(status_code=403, detail="Not a Bounty Hunter")
-
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+    game, player = _ability_user("bounty-kill", session_token)
 
     if game.state != GameState.PLAYING:
         raise HTTPException(status_code=400, detail="Game not in progress")
@@ -423,19 +310,10 @@ async def bounty_kill_endpoint(code: str, session_token: str, claimed: bool = Tr
 
 
 @router.post("/games/{code}/ability/swapper-swap")
+@serialized_per_game
 async def swapper_swap_endpoint(code: str, session_token: str, player1_id: str, player2_id: str):
     """Swapper: Select two players to swap all votes between them."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role != Role.SWAPPER:
-        raise HTTPException(status_code=403, detail="Not a Swapper")
-
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+    game, player = _ability_user("swapper-swap", session_token)
 
     if game.state != GameState.MEETING:
         raise HTTPException(status_code=400, detail="Can only swap during meetings")
@@ -443,14 +321,8 @@ async def swapper_swap_endpoint(code: str, session_token: str, player1_id: str,
     if game.active_meeting.phase != "voting":
         raise HTTPException(status_code=400, detail="Can only swap during voting phase")
 
-    player1 = game.players.get(player1_id)
-    player2 = game.players.get(player2_id)
-
-    if not player1 or not player2:
-        raise HTTPException(status_code=404, detail="Player not found")
-
-    if player1.status != PlayerStatus.ALIVE or player2.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="Can only swap votes for alive players")
+    player1 = _require_alive(game, player1_id, "Can only swap votes for alive players", "Player not found")
+    player2 = _require_alive(game, player2_id, "Can only swap votes for alive players", "Player not found")
 
     # Store swap targets - will be applied when votes are tallied
     player.swapper_targets = (player1_id, player2_id)
@@ -463,33 +335,19 @@ async def swapper_swap_endpoint(code: str, session_token: str, player1_id: str,
 
 
 @router.post("/games/{code}/ability/lookout-select")
+@serialized_per_game
 async def lookout_select_endpoint(code: str, session_token: str, target_player_id: str):
     """Lookout: Select a player to watch. Get notified when they die outside meetings."""
-    result = game_store.get_player_by_session(session_token)
-    if not result:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    game, player = result
-
-    if player.role != Role.LOOKOUT:
-        raise HTTPException(status_code=403, detail="Not a Lookout")
-
-    if player.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="You are dead")
+    game, player = _ability_user("lookout-select", session_token)
 
     if game.state != GameState.PLAYING:
         raise HTTPException(status_code=400, detail="Can only select during gameplay")
 
-    target = game.players.get(target_player_id)
-    if not target:
-        raise HTTPException(status_code=404, detail="Target not found")
+    target = _require_alive(game, target_player_id, "Target must be alive")
 
     if target.id == player.id:
         raise HTTPException(status_code=400, detail="Cannot watch yourself")
 
-    if target.status != PlayerStatus.ALIVE:
-        raise HTTPException(status_code=400, detail="Target must be alive")
-
     # Validate target was alive at last meeting (or allow all if no meeting yet)
     if game.alive_at_last_meeting and target.id not in game.alive_at_last_meeting:
         raise HTTPException(status_code=400, detail="Can only select players alive at last meeting")
@@ -1,31 +1,26 @@
 """Game routes: start, end, core gameplay actions."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+import asyncio
+from functools import lru_cache
+from typing import Annotated
+import orjson
 from ..database import game_store
-from ..models import GameState, PlayerStatus, Role, ROLE_DESCRIPTIONS
+from ..models import GameModel, GameState, PlayerStatus, Role, ROLE_DESCRIPTIONS, ROLE_KEYS_BY_CATEGORY, ACTIVE_GAME_STATES
 from ..services.ws_manager import ws_manager
 from ..services.game_logic import (
     start_game, complete_task, uncomplete_task, mark_player_dead,
-    check_win_conditions, get_role_info, get_all_roles, sheriff_shoot
+    get_role_info, get_all_roles, sheriff_shoot, end_game
 )
-from ..services.game_helpers import check_and_reassign_bounty_targets, check_executioner_fallback, check_lookout_notify
+from ..services.game_helpers import check_and_reassign_bounty_targets, check_executioner_fallback, check_lookout_notify, broadcast_with_win_check, serialized_per_game, GameDep, require_host
 
 router = APIRouter(prefix="/api", tags=["game"])
 
 
 @router.post("/games/{code}/start")
-async def start_game_endpoint(code: str, session_token: str = None):
+@serialized_per_game
+async def start_game_endpoint(game: Annotated[GameModel, Depends(require_host("start game"))]):
     """Start the game (host only)."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
-    # Verify host
-    if session_token:
-        player = game.get_player_by_session(session_token)
-        if not player or not player.is_host:
-            raise HTTPException(status_code=403, detail="Only host can start game")
-
     if game.state != GameState.LOBBY:
         raise HTTPException(status_code=400, detail="Game already started")
 
@@ -34,51 +29,38 @@ async def start_game_endpoint(code: str, session_token: str = None):
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to start game"))
 
-    # Send role info to each player via WebSocket
-    for player in game.players.values():
-        role_info = get_role_info(player, game)
-        await ws_manager.send_to_player(game.code, player.id, {
+    # Fields every player gets are built once; only the role info differs
+    adjustments = result.get("adjustments", [])
+    common = {
+        "task_percentage": game.get_task_completion_percentage(),
+        "adjustments": adjustments
+    }
+
+    # Send role info to each player via WebSocket (concurrently - one slow phone
+    # shouldn't hold up everyone else's role reveal)
+    await asyncio.gather(*(
+        ws_manager.send_to_player(game.code, player.id, {
             "type": "game_started",
-            "payload": {
-                **role_info,
-                "task_percentage": game.get_task_completion_percentage(),
-                "adjustments": result.get("adjustments", [])
-            }
+            "payload": get_role_info(player, game) | common
         })
+        for player in game.players.values()
+    ))
 
-    return {"success": True, "state": game.state.value, "adjustments": result.get("adjustments", [])}
+    return {"success": True, "state": game.state.value, "adjustments": adjustments}
 
 
 @router.post("/games/{code}/end")
-async def end_game_endpoint(code: str, session_token: str = None):
+@serialized_per_game
+async def end_game_endpoint(game: Annotated[GameModel, Depends(require_host("end game"))]):
     """End the game early (host only)."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
-    # Verify host
-    if session_token:
-        player = game.get_player_by_session(session_token)
-        if not player or not player.is_host:
-            raise HTTPException(status_code=403, detail="Only host can end game")
-
-    game.state = GameState.ENDED
-    game.winner = "Cancelled"
-    game.active_sabotage = None
-
     # Notify all players
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "game_ended",
-        "payload": {
-            "winner": game.winner,
-            "roles": get_all_roles(game)
-        }
-    })
+    await ws_manager.broadcast_to_game(game.code, end_game(game, "Cancelled"))
 
     return {"success": True}
 
 
 @router.post("/tasks/{task_id}/complete")
+@serialized_per_game
 async def complete_task_endpoint(task_id: str, session_token: str):
     """Mark a task as completed."""
     result = game_store.get_player_by_session(session_token)
@@ -95,32 +77,17 @@ async def complete_task_endpoint(task_id: str, session_token: str):
 
     task_percentage = game.get_task_completion_percentage()
 
-    # Broadcast task progress update
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "task_completed",
-        "payload": {
-            "task_percentage": task_percentage
-        }
-    })
+    # No progress broadcast: task progress is only shown to players during meetings
+    # (meeting_called carries it), so a per-task message would just be discarded
 
     # Check win conditions
-    winner = check_win_conditions(game)
-    if winner:
-        game.state = GameState.ENDED
-        game.winner = winner
-        game.active_sabotage = None
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "game_ended",
-            "payload": {
-                "winner": winner,
-                "roles": get_all_roles(game)
-            }
-        })
+    await broadcast_with_win_check(game)
 
     return {"success": True, "task_percentage": task_percentage}
 
 
 @router.post("/tasks/{task_id}/uncomplete")
+@serialized_per_game
 async def uncomplete_task_endpoint(task_id: str, session_token: str):
     """Mark a task as pending (undo completion)."""
     result = game_store.get_player_by_session(session_token)
@@ -137,18 +104,11 @@ async def uncomplete_task_endpoint(task_id: str, session_token: str):
 
     task_percentage = game.get_task_completion_percentage()
 
-    # Broadcast task progress update
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "task_completed",
-        "payload": {
-            "task_percentage": task_percentage
-        }
-    })
-
     return {"success": True, "task_percentage": task_percentage}
 
 
 @router.post("/players/{player_id}/die")
+@serialized_per_game
 async def mark_dead_endpoint(player_id: str, session_token: str):
     """Mark self as dead."""
     result = game_store.get_player_by_session(session_token)
@@ -161,7 +121,7 @@ async def mark_dead_endpoint(player_id: str, session_token: str):
     if player.id != player_id:
         raise HTTPException(status_code=403, detail="Can only mark yourself as dead")
 
-    if game.state not in [GameState.PLAYING, GameState.MEETING]:
+    if game.state not in ACTIVE_GAME_STATES:
         raise HTTPException(status_code=400, detail="Game not in progress")
 
     if not mark_player_dead(game, player_id):
@@ -181,19 +141,8 @@ async def mark_dead_endpoint(player_id: str, session_token: str):
     await check_executioner_fallback(game, player.id)
     await check_lookout_notify(game, player.id)
 
-    # Check win conditions
-    winner = check_win_conditions(game)
-    if winner:
-        game.state = GameState.ENDED
-        game.winner = winner
-        game.active_sabotage = None
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "game_ended",
-            "payload": {
-                "winner": winner,
-                "roles": get_all_roles(game)
-            }
-        })
+    # Reactions can change roles, so the win check comes after them
+    await broadcast_with_win_check(game)
 
     # Noise Maker: return flag so frontend shows target selection
     # Only during PLAYING (not during meetings - voted out doesn't trigger)
@@ -203,6 +152,7 @@ async def mark_dead_endpoint(player_id: str, session_token: str):
 
 
 @router.post("/players/{player_id}/jester-win")
+@serialized_per_game
 async def jester_win_endpoint(player_id: str, session_token: str):
     """Jester claims victory by being voted out."""
     result = game_store.get_player_by_session(session_token)
@@ -219,26 +169,17 @@ async def jester_win_endpoint(player_id: str, session_token: str):
     if player.role != Role.JESTER:
         raise HTTPException(status_code=403, detail="Only Jester can use this")
 
-    if game.state not in [GameState.PLAYING, GameState.MEETING]:
+    if game.state not in ACTIVE_GAME_STATES:
         raise HTTPException(status_code=400, detail="Game not in progress")
 
     # Jester wins!
-    game.state = GameState.ENDED
-    game.winner = "Jester"
-    game.active_sabotage = None
-
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "game_ended",
-        "payload": {
-            "winner": "Jester",
-            "roles": get_all_roles(game)
-        }
-    })
+    await ws_manager.broadcast_to_game(game.code, end_game(game, "Jester"))
 
     return {"success": True}
 
 
 @router.post("/sheriff/shoot/{target_id}")
+@serialized_per_game
 async def sheriff_shoot_endpoint(target_id: str, session_token: str):
     """Sheriff shoots a target player."""
     result = game_store.get_player_by_session(session_token)
@@ -255,10 +196,11 @@ async def sheriff_shoot_endpoint(target_id: str, session_token: str):
         raise HTTPException(status_code=400, detail=shoot_result.get("error", "Cannot shoot"))
 
     # Broadcast the death
+    dead_id = shoot_result["dead_player_id"]
     await ws_manager.broadcast_to_game(game.code, {
         "type": "player_died",
         "payload": {
-            "player_id": shoot_result["dead_player_id"],
+            "player_id": dead_id,
             "name": shoot_result["dead_player_name"],
             "cause": "sheriff_shot",
             "outcome": shoot_result["outcome"],
@@ -267,24 +209,12 @@ async def sheriff_shoot_endpoint(target_id: str, session_token: str):
     })
 
     # Handle role-specific reactions to death
-    dead_id = shoot_result["dead_player_id"]
     await check_and_reassign_bounty_targets(game, dead_id)
     await check_executioner_fallback(game, dead_id)
     await check_lookout_notify(game, dead_id)
 
-    # Check win conditions
-    winner = check_win_conditions(game)
-    if winner:
-        game.state = GameState.ENDED
-        game.winner = winner
-        game.active_sabotage = None
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "game_ended",
-            "payload": {
-                "winner": winner,
-                "roles": get_all_roles(game)
-            }
-        })
+    # Reactions can change roles, so the win check comes after them
+    await broadcast_with_win_check(game)
 
     return {"success": True, **shoot_result}
 
@@ -317,31 +247,28 @@ async def get_my_info(session_token: str):
         response["winner"] = game.winner
         response["all_roles"] = get_all_roles(game)
 
-    return response
+    # Polled often; encode with orjson directly instead of through jsonable_encoder
+    return Response(orjson.dumps(response), media_type="application/json")
+
+
+@lru_cache(maxsize=256)
+def build_role_guide_json(enabled_roles: frozenset[str]) -> bytes:
+    """Role guide JSON for a set of enabled roles, grouped by category (cached)."""
+    guide = {
+        category: [ROLE_DESCRIPTIONS[key] for key in keys if key in enabled_roles]
+        for category, keys in ROLE_KEYS_BY_CATEGORY.items()
+    }
+    return orjson.dumps(guide)
 
 
 @router.get("/games/{code}/role-guide")
-async def get_role_guide(code: str, session_token: str = None):
+async def get_role_guide(game: GameDep, session_token: str = None):
     """Get role descriptions for all enabled roles in this game."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
-    s = game.settings
-    enabled_roles = ["crewmate", "impostor"]
-
-    # All roles are now in role_configs
-    for key, config in s.role_configs.items():
-        if config.enabled and key not in enabled_roles:
-            enabled_roles.append(key)
-
-    # Build response grouped by category
-    guide = {"crew": [], "impostor": [], "neutral": []}
-    for role_key in enabled_roles:
-        desc = ROLE_DESCRIPTIONS.get(role_key)
-        if desc:
-            category = desc["category"]
-            if category in guide:
-                guide[category].append(desc)
-
-    return guide
+    # Base roles are always in the guide; the rest come from role_configs
+    enabled_roles = frozenset({
+        "crewmate", "impostor",
+        *(key for key, config in game.settings.role_configs.items() if config.enabled)
+    })
+
+    # Only a handful of role combinations are ever in play, so the serialized guide is cached
+    return Response(build_role_guide_json(enabled_roles), media_type="application/json")
@@ -1,16 +1,75 @@
 """Lobby routes: create game, join game, update settings."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import Annotated
+import orjson
 from ..database import game_store
 from ..models import (
-    CreateGameRequest, JoinGameRequest, UpdateSettingsRequest,
-    AddTaskRequest, GameState, RoleConfig
+    GameModel, CreateGameRequest, JoinGameRequest, UpdateSettingsRequest,
+    AddTaskRequest, GameState, RoleConfig, SABOTAGE_SLOTS
 )
 from ..services.ws_manager import ws_manager
+from ..services.game_logic import get_public_players
+from ..services.game_helpers import GameDep, require_host
 
 router = APIRouter(prefix="/api", tags=["lobby"])
 
 
+def _clamp(low: int, high: int):
+    return lambda value: max(low, min(high, value))
+
+
+def _keep(value):
+    return value
+
+
+def _truncate_name(value: str) -> str:
+    return value[:20]
+
+
+# Settings a PATCH can set directly: field -> normalizer (clamp/truncate/keep).
+# meeting_warning_time (clamped to the timer duration) and role_configs are handled separately.
+SETTINGS_UPDATERS = {
+    "tasks_per_player": _clamp(1, 10),
+    "num_impostors": _clamp(1, 3),
+    "enable_jester": _keep,
+    "enable_lone_wolf": _keep,
+    "enable_minion": _keep,
+    "enable_sheriff": _keep,
+    "kill_cooldown": _clamp(10, 120),
+    # Per-character cooldowns
+    "impostor_kill_cooldown": _clamp(10, 120),
+    "sheriff_shoot_cooldown": _clamp(10, 120),
+    "lone_wolf_kill_cooldown": _clamp(10, 120),
+    "enable_impostor_timer": _keep,
+    "enable_sheriff_timer": _keep,
+    "enable_lone_wolf_timer": _keep,
+    "vibrate_game_start": _keep,
+    "vibrate_meeting": _keep,
+    "vibrate_cooldown": _keep,
+    # Sabotage settings
+    "enable_sabotage": _keep,
+    "sabotage_cooldown": _clamp(10, 120),
+    **{
+        f"sabotage_{i}_{suffix}": normalize
+        for i in SABOTAGE_SLOTS
+        for suffix, normalize in (("enabled", _keep), ("name", _truncate_name), ("timer", _clamp(0, 120)))
+    },
+    # Meeting Timer & Voting settings
+    "meeting_timer_duration": _clamp(30, 300),
+    "enable_voting": _keep,
+    "anonymous_voting": _keep,
+    "discussion_time": lambda value: max(0, value),
+    # Vulture settings
+    "vulture_eat_count": _clamp(1, 10),
+    # Post-vote results timer
+    "vote_results_duration": _clamp(5, 30),
+    # Slot counts for role pools
+    "num_neutrals": _clamp(0, 5),
+    "num_advanced_crew": _clamp(0, 8),
+}
+
+
 @router.post("/games")
 async def create_game(request: CreateGameRequest):
     """Create a new game and return the game code and session token."""
@@ -60,189 +119,84 @@ async def join_game(code: str, request: JoinGameRequest):
 
 
 @router.get("/games/{code}")
-async def get_game(code: str, session_token: str = None):
+async def get_game(game: GameDep, session_token: str = None):
     """Get game state."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     # Find the requesting player if session provided
     current_player = None
     if session_token:
         current_player = game.get_player_by_session(session_token)
 
-    # Build player list (hide roles unless game ended)
-    players = []
-    for p in game.players.values():
-        player_info = {
-            "id": p.id,
-            "name": p.name,
-            "is_host": p.is_host,
-            "connected": p.connected,
-            "status": p.status.value
-        }
-        # Only show roles at game end
-        if game.state == GameState.ENDED:
-            player_info["role"] = p.role.value if p.role else None
-
-        players.append(player_info)
+    # Build player list (only show roles at game end)
+    players = get_public_players(game, include_roles=game.state == GameState.ENDED)
 
-    return {
+    response = {
         "code": game.code,
         "state": game.state.value,
-        "settings": game.settings.model_dump(),
+        "settings": game.get_settings_payload(),
         "players": players,
         "available_tasks": game.available_tasks,
         "task_percentage": game.get_task_completion_percentage(),
         "winner": game.winner
     }
+    # Polled often; encode with orjson directly instead of through jsonable_encoder
+    return Response(orjson.dumps(response), media_type="application/json")
 
 
 @router.patch("/games/{code}/settings")
-async def update_settings(code: str, request: UpdateSettingsRequest, session_token: str = None):
+async def update_settings(
+    game: Annotated[GameModel, Depends(require_host("change settings"))], request: UpdateSettingsRequest
+):
     """Update game settings (host only)."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     if game.state != GameState.LOBBY:
         raise HTTPException(status_code=400, detail="Cannot change settings after game started")
 
-    # Verify host
-    if session_token:
-        player = game.get_player_by_session(session_token)
-        if not player or not player.is_host:
-            raise HTTPException(status_code=403, detail="Only host can change settings")
-
-    # Update settings
-    if request.tasks_per_player is not None:
-        game.settings.tasks_per_player = max(1, min(10, request.tasks_per_player))
-    if request.num_impostors is not None:
-        game.settings.num_impostors = max(1, min(3, request.num_impostors))
-    if request.enable_jester is not None:
-        game.settings.enable_jester = request.enable_jester
-    if request.enable_lone_wolf is not None:
-        game.settings.enable_lone_wolf = request.enable_lone_wolf
-    if request.enable_minion is not None:
-        game.settings.enable_minion = request.enable_minion
-    if request.enable_sheriff is not None:
-        game.settings.enable_sheriff = request.enable_sheriff
-    if request.kill_cooldown is not None:
-        game.settings.kill_cooldown = max(10, min(120, request.kill_cooldown))
-    # Per-character cooldowns
-    if request.impostor_kill_cooldown is not None:
-        game.settings.impostor_kill_cooldown = max(10, min(120, request.impostor_kill_cooldown))
-    if request.sheriff_shoot_cooldown is not None:
-        game.settings.sheriff_shoot_cooldown = max(10, min(120, request.sheriff_shoot_cooldown))
-    if request.lone_wolf_kill_cooldown is not None:
-        game.settings.lone_wolf_kill_cooldown = max(10, min(120, request.lone_wolf_kill_cooldown))
-    if request.enable_impostor_timer is not None:
-        game.settings.enable_impostor_timer = request.enable_impostor_timer
-    if request.enable_sheriff_timer is not None:
-        game.settings.enable_sheriff_timer = request.enable_sheriff_timer
-    if request.enable_lone_wolf_timer is not None:
-        game.settings.enable_lone_wolf_timer = request.enable_lone_wolf_timer
-    if request.vibrate_game_start is not None:
-        game.settings.vibrate_game_start = request.vibrate_game_start
-    if request.vibrate_meeting is not None:
-        game.settings.vibrate_meeting = request.vibrate_meeting
-    if request.vibrate_cooldown is not None:
-        game.settings.vibrate_cooldown = request.vibrate_cooldown
-    # Sabotage settings
-    if request.enable_sabotage is not None:
-        game.settings.enable_sabotage = request.enable_sabotage
-    if request.sabotage_cooldown is not None:
-        game.settings.sabotage_cooldown = max(10, min(120, request.sabotage_cooldown))
-    if request.sabotage_1_enabled is not None:
-        game.settings.sabotage_1_enabled = request.sabotage_1_enabled
-    if request.sabotage_1_name is not None:
-        game.settings.sabotage_1_name = request.sabotage_1_name[:20]
-    if request.sabotage_1_timer is not None:
-        game.settings.sabotage_1_timer = max(0, min(120, request.sabotage_1_timer))
-    if request.sabotage_2_enabled is not None:
-        game.settings.sabotage_2_enabled = request.sabotage_2_enabled
-    if request.sabotage_2_name is not None:
-        game.settings.sabotage_2_name = request.sabotage_2_name[:20]
-    if request.sabotage_2_timer is not None:
-        game.settings.sabotage_2_timer = max(0, min(120, request.sabotage_2_timer))
-    if request.sabotage_3_enabled is not None:
-        game.settings.sabotage_3_enabled = request.sabotage_3_enabled
-    if request.sabotage_3_name is not None:
-        game.settings.sabotage_3_name = request.sabotage_3_name[:20]
-    if request.sabotage_3_timer is not None:
-        game.settings.sabotage_3_timer = max(0, min(120, request.sabotage_3_timer))
-    if request.sabotage_4_enabled is not None:
-        game.settings.sabotage_4_enabled = request.sabotage_4_enabled
-    if request.sabotage_4_name is not None:
-        game.settings.sabotage_4_name = request.sabotage_4_name[:20]
-    if request.sabotage_4_timer is not None:
-        game.settings.sabotage_4_timer = max(0, min(120, request.sabotage_4_timer))
-    # Meeting Timer & Voting settings
-    if request.meeting_timer_duration is not None:
-        game.settings.meeting_timer_duration = max(30, min(300, request.meeting_timer_duration))
+    # Update settings (only the fields the client actually sent)
+    for key in request.model_fields_set:
+        normalize = SETTINGS_UPDATERS.get(key)
+        value = getattr(request, key)
+        if normalize and value is not None:
+            setattr(game.settings, key, normalize(value))
     if request.meeting_warning_time is not None:
         # Warning time must be less than or equal to timer duration
         max_warning = game.settings.meeting_timer_duration
         game.settings.meeting_warning_time = max(0, min(max_warning, request.meeting_warning_time))
-    if request.enable_voting is not None:
-        game.settings.enable_voting = request.enable_voting
-    if request.anonymous_voting is not None:
-        game.settings.anonymous_voting = request.anonymous_voting
-    if request.discussion_time is not None:
-        game.settings.discussion_time = max(0, request.discussion_time)
-    # Vulture settings
-    if request.vulture_eat_count is not None:
-        game.settings.vulture_eat_count = max(1, min(10, request.vulture_eat_count))
-    # Post-vote results timer
-    if request.vote_results_duration is not None:
-        game.settings.vote_results_duration = max(5, min(30, request.vote_results_duration))
-
-    # Slot counts for role pools
-    if request.num_neutrals is not None:
-        game.settings.num_neutrals = max(0, min(5, request.num_neutrals))
-    if request.num_advanced_crew is not None:
-        game.settings.num_advanced_crew = max(0, min(8, request.num_advanced_crew))
 
     # Role configs (pool-based roles)
     if request.role_configs is not None:
         for role_key, config_data in request.role_configs.items():
-            if role_key in game.settings.role_configs:
-                current_config = game.settings.role_configs[role_key]
-                if "enabled" in config_data:
-                    current_config.enabled = config_data["enabled"]
+            if role_key in game.settings.role_configs and "enabled" in config_data:
+                game.settings.set_role_enabled(role_key, config_data["enabled"])
 
     # Sync legacy toggles with role_configs
     if request.enable_jester is not None:
-        game.settings.role_configs["jester"].enabled = request.enable_jester
+        game.settings.set_role_enabled("jester", request.enable_jester)
     if request.enable_lone_wolf is not None:
-        game.settings.role_configs["lone_wolf"].enabled = request.enable_lone_wolf
+        game.settings.set_role_enabled("lone_wolf", request.enable_lone_wolf)
     if request.enable_minion is not None:
-        game.settings.role_configs["minion"].enabled = request.enable_minion
+        game.settings.set_role_enabled("minion", request.enable_minion)
     if request.enable_sheriff is not None:
-        game.settings.role_configs["sheriff"].enabled = request.enable_sheriff
+        game.settings.set_role_enabled("sheriff", request.enable_sheriff)
+
+    game.settings_changed()
 
     # Notify players
     await ws_manager.broadcast_to_game(game.code, {
         "type": "settings_changed",
-        "payload": game.settings.model_dump()
+        "payload": game.get_settings_payload()
     })
 
-    return {"success": True, "settings": game.settings.model_dump()}
+    return {"success": True, "settings": game.get_settings_payload()}
 
 
 @router.post("/games/{code}/tasks")
-async def add_task(code: str, request: AddTaskRequest, session_token: str = None):
+async def add_task(game: GameDep, request: AddTaskRequest, session_token: str = None):
     """Add a task to the available tasks."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     task_name = request.task_name.strip()
     if not task_name:
         raise HTTPException(status_code=400, detail="Task name is required")
 
     if task_name not in game.available_tasks:
-        game.available_tasks.append(task_name)
+        game.available_tasks = (*game.available_tasks, task_name)
 
     # Notify players
     await ws_manager.broadcast_to_game(game.code, {
@@ -254,14 +208,10 @@ async def add_task(code: str, request: AddTaskRequest, session_token: str = None
 
 
 @router.delete("/games/{code}/tasks/{task_name}")
-async def remove_task(code: str, task_name: str, session_token: str = None):
+async def remove_task(game: GameDep, task_name: str, session_token: str = None):
     """Remove a task from the available tasks."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     if task_name in game.available_tasks:
-        game.available_tasks.remove(task_name)
+        game.available_tasks = tuple(t for t in game.available_tasks if t != task_name)
 
     # Notify players
     await ws_manager.broadcast_to_game(game.code, {
@@ -281,6 +231,7 @@ async def reconnect(session_token: str):
 
     game, player = result
     player.connected = True
+    game.players_changed()
 
     return {
         "success": True,
@@ -292,12 +243,8 @@ async def reconnect(session_token: str):
 
 
 @router.post("/games/{code}/leave")
-async def leave_game(code: str, session_token: str):
+async def leave_game(game: GameDep, session_token: str):
     """Leave a game. If host leaves, transfer host to next player."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     player = game.get_player_by_session(session_token)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found in game")
@@ -310,8 +257,8 @@ async def leave_game(code: str, session_token: str):
     player_name = player.name
     was_host = player.is_host
 
-    # Remove player from game
-    del game.players[player_id]
+    # Remove player from game (and drop their session)
+    game_store.remove_player(game, player_id)
 
     # If host left and there are other players, transfer host
     new_host_name = None
@@ -319,11 +266,12 @@ async def leave_game(code: str, session_token: str):
         # Get first player (by join order via dict insertion order)
         new_host = next(iter(game.players.values()))
         new_host.is_host = True
+        game.players_changed()
         new_host_name = new_host.name
 
     # If no players left, delete the game
     if not game.players:
-        game_store.delete_game(code.upper())
+        game_store.delete_game(game.code)
         return {"success": True, "game_deleted": True}
 
     # Notify remaining players
@@ -2,22 +2,20 @@
 
 from fastapi import APIRouter, HTTPException
 from ..database import game_store
-from ..models import GameState, PlayerStatus, Role, MeetingState, Vote, VoteType, ROLE_CATEGORIES, RoleCategory
+from ..models import GameState, PlayerStatus, Role, Vote, VoteType, GUESSER_ROLES
 import time
+from collections import Counter
 from ..services.ws_manager import ws_manager
-from ..services.game_logic import check_win_conditions, get_role_info, get_all_roles, reassign_bounty_target
-from ..services.game_helpers import check_and_reassign_bounty_targets
+from ..services.game_logic import get_role_info, reassign_bounty_target, get_meeting_roster, end_game
+from ..services.game_helpers import check_and_reassign_bounty_targets, open_meeting, broadcast_with_win_check, serialized_per_game, GameDep
 
 router = APIRouter(prefix="/api", tags=["meetings"])
 
 
 @router.post("/games/{code}/meeting/start")
-async def start_meeting_endpoint(code: str, session_token: str, meeting_type: str = "meeting"):
+@serialized_per_game
+async def start_meeting_endpoint(game: GameDep, session_token: str, meeting_type: str = "meeting"):
     """Call a meeting. meeting_type can be 'meeting' or 'body_report'."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     if game.state != GameState.PLAYING:
         raise HTTPException(status_code=400, detail="Game not in playing state")
 
@@ -26,88 +24,15 @@ async def start_meeting_endpoint(code: str, session_token: str, meeting_type: st
     if not player or player.status != PlayerStatus.ALIVE:
         raise HTTPException(status_code=403, detail="Only alive players can call meetings")
 
-    game.state = GameState.MEETING
-
-    # Initialize meeting state for voting
-    game.active_meeting = MeetingState(
-        started_at=time.time(),
-        started_by=player.id,
-        started_by_name=player.name,
-        meeting_type=meeting_type,
-        phase="gathering"  # Waiting for caller to start voting
-    )
-
-    # Mark all currently dead bodies as ineligible for vulture eating
-    # Bodies from previous rounds are "discovered" when a meeting starts
-    for p in game.players.values():
-        if p.status == PlayerStatus.DEAD and p.id not in game.vulture_ineligible_body_ids:
-            game.vulture_ineligible_body_ids.append(p.id)
-
-    # Handle active sabotage during meeting
-    # Reactor and O2 resolve on meeting, Lights persists
-    sabotage_resolved = None
-    if game.active_sabotage is not None:
-        sab = game.active_sabotage
-        if sab.type in ["reactor", "o2"]:
-            # Resolve sabotage
-            sabotage_resolved = {
-                "type": sab.type,
-                "name": sab.name,
-                "reason": "Meeting called"
-            }
-            game.active_sabotage = None
-            # Set cooldown
-            game.sabotage_cooldown_end = time.time() + game.settings.sabotage_cooldown
-
-        # Lights persists through meetings - don't clear it
-
-    # Broadcast meeting start (gathering phase - waiting for caller to start voting)
-    await ws_manager.broadcast_to_game(game.code, {
-        "type": "meeting_called",
-        "payload": {
-            "called_by": player.name,
-            "caller_id": player.id,  # So frontend knows who can start voting
-            "meeting_type": meeting_type,  # "meeting" or "body_report"
-            "phase": "gathering",  # Waiting phase
-            "task_percentage": game.get_task_completion_percentage(),
-            "alive_players": [
-                {"id": p.id, "name": p.name}
-                for p in game.get_alive_players()
-            ],
-            "dead_players": [
-                {"id": p.id, "name": p.name}
-                for p in game.get_dead_players()
-            ],
-            # Voting settings
-            "enable_voting": game.settings.enable_voting,
-            "anonymous_voting": game.settings.anonymous_voting,
-            "timer_duration": game.settings.meeting_timer_duration,
-            "warning_time": game.settings.meeting_warning_time
-        }
-    })
-
-    # If sabotage was resolved by meeting, broadcast that too
-    if sabotage_resolved:
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "sabotage_resolved",
-            "payload": {
-                "type": sabotage_resolved["type"],
-                "name": sabotage_resolved["name"],
-                "resolved_by": "Meeting",
-                "message": f"{sabotage_resolved['name']} resolved by meeting"
-            }
-        })
+    await open_meeting(game, player, meeting_type)
 
     return {"success": True}
 
 
 @router.post("/games/{code}/meeting/start_voting")
-async def start_voting_endpoint(code: str, session_token: str):
+@serialized_per_game
+async def start_voting_endpoint(game: GameDep, session_token: str):
     """Start the voting phase of a meeting. Only the caller can do this."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     if game.state != GameState.MEETING or not game.active_meeting:
         raise HTTPException(status_code=400, detail="No meeting in progress")
 
@@ -123,7 +48,7 @@ async def start_voting_endpoint(code: str, session_token: str):
     game.active_meeting.phase = "voting"
 
     # Set server-side timestamps for validation
-    now = time.time()
+    now = time.monotonic()
     discussion_time = game.settings.discussion_time or 0
     timer_duration = game.settings.meeting_timer_duration or 120
 
@@ -134,10 +59,7 @@ async def start_voting_endpoint(code: str, session_token: str):
     await ws_manager.broadcast_to_game(game.code, {
         "type": "voting_started",
         "payload": {
-            "alive_players": [
-                {"id": p.id, "name": p.name}
-                for p in game.get_alive_players()
-            ],
+            "alive_players": get_meeting_roster(game)[0],
             "enable_voting": game.settings.enable_voting,
             "anonymous_voting": game.settings.anonymous_voting,
             "timer_duration": game.settings.meeting_timer_duration,
@@ -150,51 +72,35 @@ async def start_voting_endpoint(code: str, session_token: str):
 
 
 @router.post("/games/{code}/meeting/end")
-async def end_meeting_endpoint(code: str, session_token: str):
+@serialized_per_game
+async def end_meeting_endpoint(game: GameDep, session_token: str):
     """End the current meeting."""
-    game = game_store.get_game(code.upper())
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
     if game.state != GameState.MEETING:
         raise HTTPException(status_code=400, detail="No meeting in progress")
 
     # Reset guesser state for next meeting
     for player in game.players.values():
-        if player.role in [Role.NICE_GUESSER, Role.EVIL_GUESSER]:
+        if player.role in GUESSER_ROLES:
             player.guesser_used_this_meeting = False
 
     # Snapshot alive players for Lookout selection constraint
-    game.alive_at_last_meeting = [p.id for p in game.get_alive_players()]
+    game.alive_at_last_meeting = list(game.alive_index)
 
     # Clear active meeting state
     game.active_meeting = None
     game.state = GameState.PLAYING
 
-    # Broadcast meeting end
-    await ws_manager.broadcast_to_game(game.code, {
+    # Broadcast meeting end (and the result, if the game is decided after the meeting)
+    await broadcast_with_win_check(game, {
         "type": "meeting_ended",
         "payload": {}
     })
 
-    # Check win conditions after meeting
-    winner = check_win_conditions(game)
-    if winner:
-        game.state = GameState.ENDED
-        game.winner = winner
-        game.active_sabotage = None
-        await ws_manager.broadcast_to_game(game.code, {
-            "type": "game_ended",
-            "payload": {
-                "winner": winner,
-                "roles": get_all_roles(game)
-            }
-        })
-
     return {"success": True}
 
 
 @router.post("/games/{code}/vote")
+@serialized_per_game
 async def cast_vote_endpoint(code: str, session_token: str, target_id: str = None):
     """Cast a vote during a meeting. target_id=None means skip vote."""
     result = game_store.get_player_by_session(session_token)
@@ -214,7 +120,7 @@ async def cast_vote_endpoint(code: str, session_token: str, target_id: str = Non
         raise HTTPException(status_code=400, detail="Voting has not started yet")
 
     # Discussion time validation - must be over
-    if game.active_meeting.discussion_end_time and time.time() < game.active_meeting.discussion_end_time:
+    if game.active_meeting.discussion_end_time and time.monotonic() < game.active_meeting.discussion_end_time:
         raise HTTPException(status_code=400, detail="Discussion time is not over yet")
 
     if player.status != PlayerStatus.ALIVE:
@@ -242,9 +148,8 @@ async def cast_vote_endpoint(code: str, session_token: str, target_id: str = Non
     game.active_meeting.votes[player.id] = vote
 
     # Count votes
-    alive_players = game.get_alive_players()
     votes_cast = len(game.active_meeting.votes)
-    votes_needed = len(alive_players)
+    votes_needed = game.count_alive()
     all_voted = votes_cast >= votes_needed
 
     # Broadcast vote cast
@@ -272,6 +177,7 @@ async def cast_vote_endpoint(code: str, session_token: str, target_id: str = Non
 
 
 @router.post("/games/{code}/meeting/timer_expired")
+@serialized_per_game
 async def meeting_timer_expired_endpoint(code: str, session_token: str):
     """Called when meeting timer expires - trigger vote results."""
     result = game_store.get_player_by_session(session_token)
@@ -299,15 +205,15 @@ async def reveal_vote_results(game):
 
     # Check for Swapper - apply vote swaps
     swapper_targets = None
-    for p in game.players.values():
-        if p.role == Role.SWAPPER and p.swapper_targets and p.status == PlayerStatus.ALIVE:
+    for p in game.get_players_with_role(Role.SWAPPER):
+        if p.swapper_targets and p.status == PlayerStatus.ALIVE:
             swapper_targets = p.swapper_targets
             # Reset for next meeting
             p.swapper_targets = None
             break
 
     # Count votes with special role handling
-    vote_counts = {}  # player_id -> count
+    vote_counts = Counter()  # player_id -> weighted count
     skip_count = 0
 
     for vote in game.active_meeting.votes.values():
@@ -328,11 +234,10 @@ async def reveal_vote_results(game):
         if vote.vote_type == VoteType.SKIP or not target_id:
             skip_count += weight
         else:
-            vote_counts[target_id] = vote_counts.get(target_id, 0) + weight
+            vote_counts[target_id] += weight
 
     # Find max votes
-    all_counts = [skip_count] + list(vote_counts.values())
-    max_votes = max(all_counts) if all_counts else 0
+    max_votes = max(skip_count, *vote_counts.values())
 
     # Determine outcome
     candidates = [pid for pid, count in vote_counts.items() if count == max_votes]
@@ -392,14 +297,13 @@ async def reveal_vote_results(game):
             target_name = game.players[vote.target_id].name if vote.target_id else "Skip"
             voter = game.players.get(vote.voter_id)
             voter_name = voter.name if voter else "Unknown"
-            if target_name not in votes_by_target:
-                votes_by_target[target_name] = []
+            voter_names = votes_by_target.setdefault(target_name, [])
             # Mayor's vote counts twice - show their name twice
             if voter and voter.role == Role.MAYOR:
-                votes_by_target[target_name].append(voter_name)
-                votes_by_target[target_name].append(voter_name)
+                voter_names.append(voter_name)
+                voter_names.append(voter_name)
             else:
-                votes_by_target[target_name].append(voter_name)
+                voter_names.append(voter_name)
 
         result["votes_by_target"] = votes_by_target
         print(f"DEBUG votes_by_target: {votes_by_target}")
@@ -423,11 +327,10 @@ async def reveal_vote_results(game):
 
     # Handle elimination
     if eliminated_player:
-        eliminated_player.status = PlayerStatus.DEAD
+        game.mark_dead(eliminated_player)
 
         # Voted-out players are ineligible for vulture eating
-        if eliminated_player.id not in game.vulture_ineligible_body_ids:
-            game.vulture_ineligible_body_ids.append(eliminated_player.id)
+        game.vulture_ineligible_body_ids.add(eliminated_player.id)
 
         # Notify everyone that this player died (so their UI updates)
         await ws_manager.broadcast_to_game(game.code, {
@@ -443,50 +346,22 @@ async def reveal_vote_results(game):
         await check_and_reassign_bounty_targets(game, eliminated_player.id)
 
         # Check for Executioner win FIRST (overrides all other win conditions)
-        for p in game.players.values():
-            if (p.role == Role.EXECUTIONER
-                    and p.status == PlayerStatus.ALIVE
+        for p in game.get_players_with_role(Role.EXECUTIONER):
+            if (p.status == PlayerStatus.ALIVE
                     and p.executioner_target_id == eliminated_player.id
                     and p.id in game.active_meeting.votes
                     and game.active_meeting.votes[p.id].target_id == eliminated_player.id):
-                game.state = GameState.ENDED
-                game.winner = "Executioner"
-                game.active_sabotage = None
-                await ws_manager.broadcast_to_game(game.code, {
-                    "type": "game_ended",
-                    "payload": {
-                        "winner": "Executioner",
-                        "reason": f"{p.name} got their target voted out!",
-                        "roles": get_all_roles(game)
-                    }
-                })
+                await ws_manager.broadcast_to_game(
+                    game.code, end_game(game, "Executioner", f"{p.name} got their target voted out!")
+                )
                 return
 
         # Check for Jester win
         if eliminated_player.role == Role.JESTER:
-            game.state = GameState.ENDED
-            game.winner = "Jester"
-            game.active_sabotage = None
-            await ws_manager.broadcast_to_game(game.code, {
-                "type": "game_ended",
-                "payload": {
-                    "winner": "Jester",
-                    "reason": f"{eliminated_player.name} was the Jester!",
-                    "roles": get_all_roles(game)
-                }
-            })
+            await ws_manager.broadcast_to_game(
+                game.code, end_game(game, "Jester", f"{eliminated_player.name} was the Jester!")
+            )
             return
 
         # Check other win conditions
-        winner = check_win_conditions(game)
-        if winner:
-            game.state = GameState.ENDED
-            game.winner = winner
-            game.active_sabotage = None
-            await ws_manager.broadcast_to_game(game.code, {
-                "type": "game_ended",
-                "payload": {
-                    "winner": winner,
-                    "roles": get_all_roles(game)
-                }
-            })
+        await broadcast_with_win_check(game)
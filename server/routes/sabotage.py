@@ -2,15 +2,17 @@
 
 from fastapi import APIRouter, HTTPException
 from ..database import game_store
-from ..models import GameState, PlayerStatus, ActiveSabotage, Role
+from ..models import GameState, PlayerStatus, ActiveSabotage, SABOTAGE_SLOTS, SABOTAGE_ROLES
 import time
 from ..services.ws_manager import ws_manager
-from ..services.game_logic import check_win_conditions, get_all_roles
+from ..services.game_logic import end_game
+from ..services.game_helpers import serialized_per_game
 
 router = APIRouter(prefix="/api", tags=["sabotage"])
 
 
 @router.post("/games/{code}/sabotage/start")
+@serialized_per_game
 async def start_sabotage_endpoint(code: str, sabotage_index: int, session_token: str):
     """Start a sabotage (impostor only, alive or dead)."""
     result = game_store.get_player_by_session(session_token)
@@ -20,8 +22,7 @@ async def start_sabotage_endpoint(code: str, sabotage_index: int, session_token:
     game, player = result
 
     # Must be impostor-aligned (except Minion) — alive or dead can trigger
-    impostor_sabotage_roles = [Role.IMPOSTOR, Role.EVIL_GUESSER, Role.BOUNTY_HUNTER, Role.CLEANER, Role.VENTER]
-    if player.role not in impostor_sabotage_roles:
+    if player.role not in SABOTAGE_ROLES:
         raise HTTPException(status_code=403, detail="Only impostors can sabotage")
 
     # Game must be in progress (not meeting, not ended)
@@ -37,29 +38,25 @@ async def start_sabotage_endpoint(code: str, sabotage_index: int, session_token:
         raise HTTPException(status_code=400, detail="Sabotage already active")
 
     # Check cooldown
-    if game.sabotage_cooldown_end and time.time() < game.sabotage_cooldown_end:
-        remaining = int(game.sabotage_cooldown_end - time.time())
+    if game.sabotage_cooldown_end and time.monotonic() < game.sabotage_cooldown_end:
+        remaining = int(game.sabotage_cooldown_end - time.monotonic())
         raise HTTPException(status_code=400, detail=f"Sabotage on cooldown ({remaining}s)")
 
     # Get sabotage settings
-    if sabotage_index < 1 or sabotage_index > 4:
+    if sabotage_index not in SABOTAGE_SLOTS:
         raise HTTPException(status_code=400, detail="Invalid sabotage index")
 
-    enabled = getattr(game.settings, f"sabotage_{sabotage_index}_enabled")
+    enabled, name, sab_type, timer = game.settings.get_sabotage(sabotage_index)
     if not enabled:
         raise HTTPException(status_code=400, detail="This sabotage is disabled")
 
-    name = getattr(game.settings, f"sabotage_{sabotage_index}_name")
-    sab_type = getattr(game.settings, f"sabotage_{sabotage_index}_type")
-    timer = getattr(game.settings, f"sabotage_{sabotage_index}_timer")
-
     # Create active sabotage
     game.active_sabotage = ActiveSabotage(
         index=sabotage_index,
         type=sab_type,
         name=name,
         timer=timer,
-        started_at=time.time(),
+        started_at=time.monotonic(),
         started_by=player.id
     )
 
@@ -79,6 +76,7 @@ async def start_sabotage_endpoint(code: str, sabotage_index: int, session_token:
 
 
 @router.post("/games/{code}/sabotage/fix")
+@serialized_per_game
 async def fix_sabotage_endpoint(code: str, session_token: str, action: str = "tap"):
     """Fix sabotage. action: 'tap' for lights/o2, 'hold_start'/'hold_end' for reactor."""
     result = game_store.get_player_by_session(session_token)
@@ -107,8 +105,7 @@ async def fix_sabotage_endpoint(code: str, session_token: str, action: str = "ta
     elif sab.type == "reactor":
         # Reactor: 2 people must hold simultaneously
         if action == "hold_start":
-            if player.id not in sab.reactor_holders:
-                sab.reactor_holders.append(player.id)
+            sab.reactor_holders.add(player.id)
             # Check if 2 people holding
             if len(sab.reactor_holders) >= 2:
                 resolved = True
@@ -125,8 +122,7 @@ async def fix_sabotage_endpoint(code: str, session_token: str, action: str = "ta
                 })
                 return {"success": True, "holding": True, "holders": len(sab.reactor_holders)}
         elif action == "hold_end":
-            if player.id in sab.reactor_holders:
-                sab.reactor_holders.remove(player.id)
+            sab.reactor_holders.discard(player.id)
             await ws_manager.broadcast_to_game(game.code, {
                 "type": "sabotage_update",
                 "payload": {
@@ -157,7 +153,7 @@ async def fix_sabotage_endpoint(code: str, session_token: str, action: str = "ta
     if resolved:
         game.active_sabotage = None
         # Set cooldown
-        game.sabotage_cooldown_end = time.time() + game.settings.sabotage_cooldown
+        game.sabotage_cooldown_end = time.monotonic() + game.settings.sabotage_cooldown
 
         await ws_manager.broadcast_to_game(game.code, {
             "type": "sabotage_resolved",
@@ -173,6 +169,7 @@ async def fix_sabotage_endpoint(code: str, session_token: str, action: str = "ta
 
 
 @router.post("/games/{code}/sabotage/check_timeout")
+@serialized_per_game
 async def check_sabotage_timeout_endpoint(code: str, session_token: str):
     """Check if sabotage timer expired (called by clients periodically)."""
     result = game_store.get_player_by_session(session_token)
@@ -192,21 +189,12 @@ async def check_sabotage_timeout_endpoint(code: str, session_token: str):
 
     # Check if timer expired
     if sab.timer > 0:
-        elapsed = time.time() - sab.started_at
+        elapsed = time.monotonic() - sab.started_at
         if elapsed >= sab.timer:
             # Impostor wins!
-            game.state = GameState.ENDED
-            game.winner = "Impostor"
-            game.active_sabotage = None
-
-            await ws_manager.broadcast_to_game(game.code, {
-                "type": "game_ended",
-                "payload": {
-                    "winner": "Impostor",
-                    "reason": f"{sab.name} was not fixed in time!",
-                    "roles": get_all_roles(game)
-                }
-            })
+            await ws_manager.broadcast_to_game(
+                game.code, end_game(game, "Impostor", f"{sab.name} was not fixed in time!")
+            )
 
             return {"success": True, "expired": True, "winner": "Impostor"}
 
@@ -225,14 +213,14 @@ async def get_sabotage_status_endpoint(code: str, session_token: str):
     if game.active_sabotage is None:
         cooldown_remaining = 0
         if game.sabotage_cooldown_end:
-            cooldown_remaining = max(0, int(game.sabotage_cooldown_end - time.time()))
+            cooldown_remaining = max(0, int(game.sabotage_cooldown_end - time.monotonic()))
         return {
             "active": False,
             "cooldown_remaining": cooldown_remaining
         }
 
     sab = game.active_sabotage
-    elapsed = time.time() - sab.started_at
+    elapsed = time.monotonic() - sab.started_at
     remaining = max(0, sab.timer - elapsed) if sab.timer > 0 else 0
 
     return {
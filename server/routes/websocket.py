@@ -1,10 +1,11 @@
 """WebSocket route for real-time game updates."""
 
+import orjson
 import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..database import game_store
-from ..services.ws_manager import ws_manager
-from ..services.game_logic import get_role_info
+from ..services.ws_manager import ws_manager, encode_message
+from ..services.game_logic import get_role_info, get_public_players, get_meeting_roster
 
 router = APIRouter()
 
@@ -29,6 +30,8 @@ async def websocket_endpoint(websocket: WebSocket, game_code: str, session_token
     # Connect
     await ws_manager.connect(game_code.upper(), player.id, websocket)
     player.connected = True
+    game.players_changed()
+    game.last_activity = time.monotonic()
 
     # Send current state on connect
     state_payload = {
@@ -36,16 +39,7 @@ async def websocket_endpoint(websocket: WebSocket, game_code: str, session_token
         "payload": {
             "game_state": game.state.value,
             "task_percentage": game.get_task_completion_percentage(),
-            "players": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "is_host": p.is_host,
-                    "connected": p.connected,
-                    "status": p.status.value
-                }
-                for p in game.players.values()
-            ]
+            "players": get_public_players(game)
         }
     }
 
@@ -60,7 +54,7 @@ async def websocket_endpoint(websocket: WebSocket, game_code: str, session_token
     # Add active sabotage if any
     if game.active_sabotage:
         sab = game.active_sabotage
-        elapsed = time.time() - sab.started_at
+        elapsed = time.monotonic() - sab.started_at
         remaining = max(0, sab.timer - elapsed) if sab.timer > 0 else 0
         state_payload["payload"]["active_sabotage"] = {
             "index": sab.index,
@@ -74,7 +68,8 @@ async def websocket_endpoint(websocket: WebSocket, game_code: str, session_token
     # Add active meeting state for reconnection
     if game.active_meeting:
         meeting = game.active_meeting
-        now = time.time()
+        now = time.monotonic()
+        alive_players, dead_players = get_meeting_roster(game)
         state_payload["payload"]["active_meeting"] = {
             "phase": meeting.phase,
             "meeting_type": meeting.meeting_type,
@@ -82,17 +77,15 @@ async def websocket_endpoint(websocket: WebSocket, game_code: str, session_token
             "caller_name": meeting.started_by_name,
             "has_voted": player.id in meeting.votes,
             "votes_cast": len(meeting.votes),
-            "votes_needed": len(game.get_alive_players()),
-            "discussion_ends_at": meeting.discussion_end_time,
-            "voting_ends_at": meeting.voting_end_time,
+            "votes_needed": game.count_alive(),
             "discussion_remaining": max(0, meeting.discussion_end_time - now) if meeting.discussion_end_time else 0,
             "voting_remaining": max(0, meeting.voting_end_time - now) if meeting.voting_end_time else 0,
-            "alive_players": [{"id": p.id, "name": p.name} for p in game.get_alive_players()],
-            "dead_players": [{"id": p.id, "name": p.name} for p in game.get_dead_players()],
+            "alive_players": alive_players,
+            "dead_players": dead_players,
             "result": meeting.result
         }
 
-    await websocket.send_json(state_payload)
+    await websocket.send_text(encode_message(state_payload))
 
     # Notify others that player connected
     await ws_manager.broadcast_to_game(game_code.upper(), {
@@ -103,14 +96,17 @@ async def websocket_endpoint(websocket: WebSocket, game_code: str, session_token
     try:
         while True:
             # Keep connection alive, handle any client messages
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
+            game.last_activity = time.monotonic()
 
             # Handle ping/pong for keepalive
             if data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_text('{"type":"pong"}')
 
     except WebSocketDisconnect:
         player.connected = False
+        game.players_changed()
+        game.last_activity = time.monotonic()
         ws_manager.disconnect(game_code.upper(), player.id)
 
         # Notify others
@@ -1,14 +1,85 @@
 """Shared async game helpers that bridge game logic and WebSocket notifications."""
-from ..models import Role, PlayerStatus
-from ..services.game_logic import reassign_bounty_target
+import functools
+import time
+from typing import Annotated, Optional
+from fastapi import Depends, HTTPException
+from ..database import game_store
+from ..models import Role, PlayerStatus, GameState, MeetingState, GameModel
+from ..services.game_logic import reassign_bounty_target, get_meeting_roster, check_win_conditions, end_game
 from ..services.ws_manager import ws_manager
 
 
+async def resolve_game(code: str) -> GameModel:
+    """FastAPI dependency: the game for the `code` path parameter (any case), or 404."""
+    game = game_store.get_game(code)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return game
+
+
+# Endpoint parameter type for routes under /games/{code}
+GameDep = Annotated[GameModel, Depends(resolve_game)]
+
+
+def require_host(action: str):
+    """Dependency factory: the game, once the session (if given) is checked to be its host.
+
+    Raises 403 "Only host can <action>" for anyone else.
+    """
+    async def host_game(game: GameDep, session_token: Optional[str] = None) -> GameModel:
+        if session_token:
+            player = game.get_player_by_session(session_token)
+            if not player or not player.is_host:
+                raise HTTPException(status_code=403, detail=f"Only host can {action}")
+        return game
+    return host_game
+
+
+def serialized_per_game(endpoint):
+    """Run an endpoint under its game's lock.
+
+    Endpoints check state, mutate, then await broadcasts; without the lock a second
+    request for the same game can pass the same checks while the first is suspended
+    (double kills, two meetings, duplicate game_ended). The game comes from GameDep,
+    else the `session_token` (the game the endpoint will actually act on), else the
+    `code` path parameter. If none resolves, the endpoint runs unlocked and raises
+    its own 404. Each request also counts as activity for stale-game cleanup, so a
+    game played over REST while every socket is asleep is not expired.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        game = kwargs.get("game")  # Already resolved by GameDep
+        if game is None and "session_token" in kwargs:
+            result = game_store.get_player_by_session(kwargs["session_token"])
+            game = result[0] if result else None
+        if game is None and "code" in kwargs:
+            game = game_store.get_game(kwargs["code"])
+        if game is None:
+            return await endpoint(**kwargs)
+        async with game.lock:
+            game.last_activity = time.monotonic()
+            return await endpoint(**kwargs)
+    return wrapper
+
+
+async def broadcast_with_win_check(game, *messages):
+    """Broadcast `messages`, plus game_ended if the game is now decided. Returns the winner.
+
+    Call after all of an action's state changes; everything goes out as one frame.
+    """
+    messages = list(messages)
+    winner = check_win_conditions(game)
+    if winner:
+        messages.append(end_game(game, winner))
+    if messages:
+        await ws_manager.broadcast_batch(game.code, messages)
+    return winner
+
+
 async def check_and_reassign_bounty_targets(game, dead_player_id: str):
     """If any alive Rampager has the dead player as their bounty target, reassign and notify."""
-    for player in game.players.values():
-        if (player.role == Role.BOUNTY_HUNTER
-                and player.status == PlayerStatus.ALIVE
+    for player in game.get_players_with_role(Role.BOUNTY_HUNTER):
+        if (player.status == PlayerStatus.ALIVE
                 and player.bounty_target_id == dead_player_id):
             new_target_id = reassign_bounty_target(game, player)
             new_target_name = None
@@ -29,11 +100,10 @@ async def check_and_reassign_bounty_targets(game, dead_player_id: str):
 
 async def check_executioner_fallback(game, dead_player_id: str):
     """If Executioner's target dies outside voting, convert Executioner to Jester."""
-    for player in game.players.values():
-        if (player.role == Role.EXECUTIONER
-                and player.status == PlayerStatus.ALIVE
+    for player in game.get_players_with_role(Role.EXECUTIONER):
+        if (player.status == PlayerStatus.ALIVE
                 and player.executioner_target_id == dead_player_id):
-            player.role = Role.JESTER
+            game.set_role(player, Role.JESTER)
             player.executioner_target_id = None
             await ws_manager.send_to_player(game.code, player.id, {
                 "type": "role_changed",
@@ -52,9 +122,8 @@ async def check_lookout_notify(game, dead_player_id: str):
     dead_player = game.players.get(dead_player_id)
     if not dead_player:
         return
-    for player in game.players.values():
-        if (player.role == Role.LOOKOUT
-                and player.status == PlayerStatus.ALIVE
+    for player in game.get_players_with_role(Role.LOOKOUT):
+        if (player.status == PlayerStatus.ALIVE
                 and player.lookout_target_id == dead_player_id):
             await ws_manager.send_to_player(game.code, player.id, {
                 "type": "lookout_alert",
@@ -63,3 +132,63 @@ async def check_lookout_notify(game, dead_player_id: str):
                     "message": f"Your watched player {dead_player.name} has been killed!"
                 }
             })
+
+
+async def open_meeting(game, caller, meeting_type: str = "meeting"):
+    """Start a meeting called by `caller` and broadcast it (callers run their own guards).
+
+    Shared by normal meetings, body reports, the Captain's remote meeting and the
+    Noise Maker's body report.
+    """
+    game.state = GameState.MEETING
+    game.active_meeting = MeetingState(
+        started_at=time.monotonic(),
+        started_by=caller.id,
+        started_by_name=caller.name,
+        meeting_type=meeting_type,
+        phase="gathering"  # Waiting for caller to start voting
+    )
+
+    # Mark all currently dead bodies as ineligible for vulture eating
+    # Bodies from previous rounds are "discovered" when a meeting starts
+    game.vulture_ineligible_body_ids.update(game.dead_index)
+
+    # Reactor and O2 resolve on meeting, Lights persists
+    sabotage_resolved = None
+    sab = game.active_sabotage
+    if sab is not None and sab.type in ("reactor", "o2"):
+        sabotage_resolved = sab
+        game.active_sabotage = None
+        game.sabotage_cooldown_end = time.monotonic() + game.settings.sabotage_cooldown
+
+    # Broadcast meeting start (gathering phase - waiting for caller to start voting)
+    alive_players, dead_players = get_meeting_roster(game)
+    await ws_manager.broadcast_to_game(game.code, {
+        "type": "meeting_called",
+        "payload": {
+            "called_by": caller.name,
+            "caller_id": caller.id,  # So frontend knows who can start voting
+            "meeting_type": meeting_type,  # "meeting" or "body_report"
+            "phase": "gathering",
+            "task_percentage": game.get_task_completion_percentage(),
+            "alive_players": alive_players,
+            "dead_players": dead_players,
+            # Voting settings
+            "enable_voting": game.settings.enable_voting,
+            "anonymous_voting": game.settings.anonymous_voting,
+            "timer_duration": game.settings.meeting_timer_duration,
+            "warning_time": game.settings.meeting_warning_time,
+            "discussion_time": game.settings.discussion_time
+        }
+    })
+
+    if sabotage_resolved:
+        await ws_manager.broadcast_to_game(game.code, {
+            "type": "sabotage_resolved",
+            "payload": {
+                "type": sabotage_resolved.type,
+                "name": sabotage_resolved.name,
+                "resolved_by": "Meeting",
+                "message": f"{sabotage_resolved.name} resolved by meeting"
+            }
+        })
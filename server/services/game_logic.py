@@ -7,7 +7,8 @@ import random
 from typing import Optional
 from ..models import (
     GameModel, PlayerModel, TaskModel, Role, GameState,
-    PlayerStatus, TaskStatus, RoleCategory, ROLE_CATEGORIES, RoleConfig
+    PlayerStatus, TaskStatus, RoleCategory, DEFAULT_ROLE_CONFIG,
+    IMPOSTOR_VISIBLE_ROLES, GUESSER_ROLES, ACTIVE_GAME_STATES
 )
 
 
@@ -73,7 +74,7 @@ def assign_roles(game: GameModel) -> bool:
 
     # === PHASE 1: Impostor slots ===
     enabled_imp = [k for k in IMPOSTOR_VARIANT_KEYS
-                   if settings.role_configs.get(k, RoleConfig()).enabled]
+                   if settings.role_configs.get(k, DEFAULT_ROLE_CONFIG).enabled]
     random.shuffle(enabled_imp)
     imp_to_assign = enabled_imp[:settings.num_impostors]
     # Fill remaining impostor slots with base Impostor
@@ -81,43 +82,43 @@ def assign_roles(game: GameModel) -> bool:
         imp_to_assign.append("impostor")
     random.shuffle(imp_to_assign)
     for key in imp_to_assign:
-        players[role_index].role = ROLE_MAP[key]
+        game.set_role(players[role_index], ROLE_MAP[key])
         role_index += 1
 
     # === PHASE 2: Neutral slots ===
     enabled_neut = [k for k in NEUTRAL_ROLE_KEYS
-                    if settings.role_configs.get(k, RoleConfig()).enabled]
+                    if settings.role_configs.get(k, DEFAULT_ROLE_CONFIG).enabled]
     random.shuffle(enabled_neut)
     neut_to_assign = enabled_neut[:settings.num_neutrals]
     for key in neut_to_assign:
-        players[role_index].role = ROLE_MAP[key]
+        game.set_role(players[role_index], ROLE_MAP[key])
         role_index += 1
 
     # === PHASE 3: Crew variant slots ===
     enabled_crew = [k for k in CREW_VARIANT_KEYS
-                    if settings.role_configs.get(k, RoleConfig()).enabled]
+                    if settings.role_configs.get(k, DEFAULT_ROLE_CONFIG).enabled]
     random.shuffle(enabled_crew)
     crew_to_assign = enabled_crew[:settings.num_advanced_crew]
     for key in crew_to_assign:
-        players[role_index].role = ROLE_MAP[key]
+        game.set_role(players[role_index], ROLE_MAP[key])
         role_index += 1
 
     # === PHASE 4: Fill remaining with Crewmate ===
     while role_index < num_players:
-        players[role_index].role = Role.CREWMATE
+        game.set_role(players[role_index], Role.CREWMATE)
         role_index += 1
 
     # === POST-ASSIGNMENT: Setup role-specific state ===
     # Bounty Hunter (Rampager) targets
-    alive_non_impostors = [p for p in players if ROLE_CATEGORIES.get(p.role) != RoleCategory.IMPOSTOR]
-    for player in players:
-        if player.role == Role.BOUNTY_HUNTER and alive_non_impostors:
+    alive_non_impostors = [p for p in players if p.category != RoleCategory.IMPOSTOR]
+    if alive_non_impostors:
+        for player in game.get_players_with_role(Role.BOUNTY_HUNTER):
             player.bounty_target_id = random.choice(alive_non_impostors).id
 
     # Executioner targets (random crew-aligned player, not themselves)
-    crew_players = [p for p in players if ROLE_CATEGORIES.get(p.role) == RoleCategory.CREW]
-    for player in players:
-        if player.role == Role.EXECUTIONER and crew_players:
+    crew_players = [p for p in players if p.category == RoleCategory.CREW]
+    for player in game.get_players_with_role(Role.EXECUTIONER):
+        if crew_players:
             valid_targets = [p for p in crew_players if p.id != player.id]
             if valid_targets:
                 player.executioner_target_id = random.choice(valid_targets).id
@@ -130,7 +131,7 @@ def reassign_bounty_target(game: GameModel, bounty_hunter: PlayerModel) -> Optio
     Returns the new target's ID, or None if no valid targets."""
     valid_targets = [
         p for p in game.get_alive_players()
-        if ROLE_CATEGORIES.get(p.role) != RoleCategory.IMPOSTOR
+        if p.category != RoleCategory.IMPOSTOR
         and p.id != bounty_hunter.id
     ]
     if not valid_targets:
@@ -148,7 +149,7 @@ def distribute_tasks(game: GameModel):
 
     Ported from main.py lines 220-240.
     """
-    available = game.available_tasks.copy()
+    available = list(game.available_tasks)
     tasks_per = game.settings.tasks_per_player
     task_doer_count = 0  # Crew-aligned roles
 
@@ -160,15 +161,15 @@ def distribute_tasks(game: GameModel):
         selected_tasks = available[:tasks_per]
 
         # Create task objects - Crew-aligned roles get real tasks
-        is_crew = ROLE_CATEGORIES.get(player.role) == RoleCategory.CREW
+        is_crew = player.category == RoleCategory.CREW
         # Minion appears as crew but doesn't count for tasks
         is_minion = player.role == Role.MINION
         is_fake = not is_crew or is_minion
 
-        player.tasks = [
-            TaskModel(name=task_name, is_fake=is_fake)
-            for task_name in selected_tasks
-        ]
+        player.tasks = {
+            task.id: task
+            for task in (TaskModel(name=task_name, is_fake=is_fake) for task_name in selected_tasks)
+        }
 
         # Only count actual crew members (not minion)
         if is_crew and not is_minion:
@@ -176,6 +177,7 @@ def distribute_tasks(game: GameModel):
 
     # Set total task count (crew-aligned roles minus minion)
     game.crewmate_task_total = task_doer_count * tasks_per
+    game.crewmate_tasks_completed = 0
 
 
 def start_game(game: GameModel) -> dict:
@@ -216,6 +218,7 @@ def start_game(game: GameModel) -> dict:
         settings.num_advanced_crew = min(settings.num_advanced_crew, remaining)
         if settings.num_advanced_crew < old_crew:
             adjustments.append(f"Advanced crew reduced from {old_crew} to {settings.num_advanced_crew}")
+        game.settings_changed()
 
     if settings.num_impostors < 1:
         return {"success": False, "error": "Need at least 1 impostor"}
@@ -240,42 +243,34 @@ def check_win_conditions(game: GameModel) -> Optional[str]:
 
     Updated to use role categories for new roles.
     """
-    if game.state not in [GameState.PLAYING, GameState.MEETING]:
+    if game.state not in ACTIVE_GAME_STATES:
         return None
 
-    alive = game.get_alive_players()
-
-    # Count alive by category
-    num_impostor_team = sum(
-        1 for p in alive
-        if ROLE_CATEGORIES.get(p.role) == RoleCategory.IMPOSTOR
-    )
-    num_crew_team = sum(
-        1 for p in alive
-        if ROLE_CATEGORIES.get(p.role) == RoleCategory.CREW
-    )
-    num_neutral = sum(
-        1 for p in alive
-        if ROLE_CATEGORIES.get(p.role) == RoleCategory.NEUTRAL
-    )
+    # Running counts kept by GameModel (add_player/set_role/mark_dead) - no player scan
+    num_alive = game.count_alive()
+    num_impostor_team = game.count_alive_in(RoleCategory.IMPOSTOR)
+    num_crew_team = game.count_alive_in(RoleCategory.CREW)
+    num_neutral = game.count_alive_in(RoleCategory.NEUTRAL)
 
     # Check specific neutral roles
-    lone_wolf_alive = any(p.role == Role.LONE_WOLF for p in alive)
+    lone_wolf_alive = any(
+        p.status == PlayerStatus.ALIVE for p in game.get_players_with_role(Role.LONE_WOLF)
+    )
 
     # Vulture win check - if any vulture has eaten enough bodies
     vulture_win_threshold = game.settings.vulture_eat_count
-    for player in game.players.values():
-        if player.role == Role.VULTURE and player.vulture_bodies_eaten >= vulture_win_threshold:
+    for player in game.get_players_with_role(Role.VULTURE):
+        if player.vulture_bodies_eaten >= vulture_win_threshold:
             return "Vulture"
 
-    # Task completion win (crew-aligned roles)
-    if game.get_task_completion_percentage() >= 100:
+    # Task completion win (crew-aligned roles) - straight from the running counters
+    if game.crewmate_task_total and game.crewmate_tasks_completed >= game.crewmate_task_total:
         return "Crewmate"
 
     # Last one standing wins
-    if len(alive) == 1:
-        survivor = alive[0]
-        category = ROLE_CATEGORIES.get(survivor.role)
+    if num_alive == 1:
+        survivor = next(iter(game.alive_index.values()))
+        category = survivor.category
         if survivor.role == Role.LONE_WOLF:
             return "Lone Wolf"
         if category == RoleCategory.IMPOSTOR:
@@ -284,7 +279,7 @@ def check_win_conditions(game: GameModel) -> Optional[str]:
             return "Crewmate"
 
     # Lone Wolf vs Impostor: if only these two are left, game continues until one dies
-    if len(alive) == 2 and lone_wolf_alive and num_impostor_team == 1:
+    if num_alive == 2 and lone_wolf_alive and num_impostor_team == 1:
         return None
 
     # All impostors dead = Crewmate win (unless Lone Wolf or other killers alive)
@@ -292,14 +287,14 @@ def check_win_conditions(game: GameModel) -> Optional[str]:
         return "Crewmate"
 
     # Impostor win: outnumber or equal all non-impostors, no lone wolf, at least 1 impostor
-    # Note: Minion counts with impostors now via ROLE_CATEGORIES
+    # Note: Minion counts with impostors now via their category
     # Must count neutrals (Vulture etc) as non-impostor - they're still targets
     num_non_impostor = num_crew_team + num_neutral
     if not lone_wolf_alive and num_impostor_team >= num_non_impostor and num_impostor_team > 0:
         return "Impostor"
 
     # Lone Wolf win: only crew left and it's just LW vs 1 crewmate
-    if lone_wolf_alive and len(alive) == 2 and num_impostor_team == 0:
+    if lone_wolf_alive and num_alive == 2 and num_impostor_team == 0:
         return "Lone Wolf"
 
     # Game continues
@@ -315,15 +310,16 @@ def complete_task(game: GameModel, player_id: str, task_id: str) -> bool:
     # Crew-aligned roles (except Minion) can complete real tasks
     if not player:
         return False
-    is_crew = ROLE_CATEGORIES.get(player.role) == RoleCategory.CREW
+    is_crew = player.category == RoleCategory.CREW
     is_minion = player.role == Role.MINION
     if not is_crew or is_minion:
         return False
 
-    for task in player.tasks:
-        if task.id == task_id and task.status == TaskStatus.PENDING:
-            task.status = TaskStatus.COMPLETED
-            return True
+    task = player.tasks.get(task_id)
+    if task and task.status == TaskStatus.PENDING:
+        task.status = TaskStatus.COMPLETED
+        game.crewmate_tasks_completed += 1
+        return True
 
     return False
 
@@ -337,15 +333,16 @@ def uncomplete_task(game: GameModel, player_id: str, task_id: str) -> bool:
     # Crew-aligned roles (except Minion) can uncomplete real tasks
     if not player:
         return False
-    is_crew = ROLE_CATEGORIES.get(player.role) == RoleCategory.CREW
+    is_crew = player.category == RoleCategory.CREW
     is_minion = player.role == Role.MINION
     if not is_crew or is_minion:
         return False
 
-    for task in player.tasks:
-        if task.id == task_id and task.status == TaskStatus.COMPLETED:
-            task.status = TaskStatus.PENDING
-            return True
+    task = player.tasks.get(task_id)
+    if task and task.status == TaskStatus.COMPLETED:
+        task.status = TaskStatus.PENDING
+        game.crewmate_tasks_completed -= 1
+        return True
 
     return False
 
@@ -376,10 +373,10 @@ def sheriff_shoot(game: GameModel, sheriff_id: str, target_id: str) -> dict:
         return {"success": False, "error": "Cannot shoot yourself"}
 
     # Determine outcome - hitting impostor-aligned roles is a success
-    target_category = ROLE_CATEGORIES.get(target.role)
+    target_category = target.category
     if target_category == RoleCategory.IMPOSTOR:
         # Sheriff hit an impostor - target dies
-        target.status = PlayerStatus.DEAD
+        game.mark_dead(target)
         return {
             "success": True,
             "outcome": "hit",
@@ -389,7 +386,7 @@ def sheriff_shoot(game: GameModel, sheriff_id: str, target_id: str) -> dict:
         }
     else:
         # Sheriff missed (crew or neutral) - sheriff dies
-        sheriff.status = PlayerStatus.DEAD
+        game.mark_dead(sheriff)
         return {
             "success": True,
             "outcome": "miss",
@@ -408,7 +405,7 @@ def mark_player_dead(game: GameModel, player_id: str) -> bool:
     if not player or player.status != PlayerStatus.ALIVE:
         return False
 
-    player.status = PlayerStatus.DEAD
+    game.mark_dead(player)
     return True
 
 
@@ -418,23 +415,20 @@ def get_role_info(player: PlayerModel, game: GameModel) -> dict:
         "role": player.role.value,
         "tasks": [
             {"id": t.id, "name": t.name, "status": t.status.value, "is_fake": t.is_fake}
-            for t in player.tasks
+            for t in player.tasks.values()
         ]
     }
 
     # Impostor-aligned roles (excluding Minion) can see who the "impostors" are
     # This includes Spy (who appears as impostor to impostors)
     # Minion is blind - doesn't know who impostors are (matches original DC bot)
-    player_category = ROLE_CATEGORIES.get(player.role)
+    player_category = player.category
     if player_category == RoleCategory.IMPOSTOR and player.role != Role.MINION:
         # Show all impostor-aligned AND Spy, but NOT Minion (impostors don't know who Minion is)
         info["fellow_impostors"] = [
             {"id": p.id, "name": p.name}
             for p in game.players.values()
-            if p.id != player.id and (
-                (ROLE_CATEGORIES.get(p.role) == RoleCategory.IMPOSTOR and p.role != Role.MINION) or
-                p.role == Role.SPY  # Spy appears as impostor to impostors
-            )
+            if p.id != player.id and p.role in IMPOSTOR_VISIBLE_ROLES
         ]
 
     # Role-specific info
@@ -448,8 +442,9 @@ def get_role_info(player: PlayerModel, game: GameModel) -> dict:
     if player.role == Role.VULTURE:
         info["bodies_eaten"] = player.vulture_bodies_eaten
         info["bodies_needed"] = game.settings.vulture_eat_count
-        info["eaten_body_ids"] = player.vulture_eaten_body_ids
-        info["ineligible_body_ids"] = game.vulture_ineligible_body_ids
+        # Sets -> lists for JSON (orjson doesn't serialize sets)
+        info["eaten_body_ids"] = list(player.vulture_eaten_body_ids)
+        info["ineligible_body_ids"] = list(game.vulture_ineligible_body_ids)
 
     if player.role == Role.ENGINEER:
         info["remote_fix_available"] = not player.engineer_fix_used
@@ -457,7 +452,7 @@ def get_role_info(player: PlayerModel, game: GameModel) -> dict:
     if player.role == Role.CAPTAIN:
         info["extra_meeting_available"] = not player.captain_meeting_used
 
-    if player.role in [Role.NICE_GUESSER, Role.EVIL_GUESSER]:
+    if player.role in GUESSER_ROLES:
         info["guess_available_this_meeting"] = not player.guesser_used_this_meeting
 
     if player.role == Role.SWAPPER:
@@ -478,22 +473,76 @@ def get_role_info(player: PlayerModel, game: GameModel) -> dict:
         if game.alive_at_last_meeting:
             info["lookout_selectable"] = [
                 {"id": p.id, "name": p.name}
-                for p in game.players.values()
-                if p.id in game.alive_at_last_meeting and p.id != player.id and p.status == PlayerStatus.ALIVE
+                for p in game.alive_index.values()
+                if p.id in game.alive_at_last_meeting and p.id != player.id
             ]
         else:
             info["lookout_selectable"] = [
                 {"id": p.id, "name": p.name}
-                for p in game.players.values()
-                if p.id != player.id and p.status == PlayerStatus.ALIVE
+                for p in game.alive_index.values()
+                if p.id != player.id
             ]
 
     return info
 
 
+def get_meeting_roster(game: GameModel) -> tuple[list[dict], list[dict]]:
+    """Alive and dead {id, name} lists for meeting payloads (shared lists - do not mutate).
+
+    Built from the status indexes and cached until a player joins, leaves or dies.
+    """
+    if game.roster_cache is None:
+        game.roster_cache = (
+            [{"id": p.id, "name": p.name} for p in game.alive_index.values()],
+            [{"id": p.id, "name": p.name} for p in game.dead_index.values()],
+        )
+    return game.roster_cache
+
+
+def get_public_players(game: GameModel, include_roles: bool = False) -> list[dict]:
+    """Get the public player list (roles only when include_roles, i.e. at game end).
+
+    Shared list - do not mutate. Cached until game.players_changed().
+    """
+    players = game.public_players_cache.get(include_roles)
+    if players is not None:
+        return players
+    if include_roles:
+        players = [
+            {"id": p.id, "name": p.name, "is_host": p.is_host, "connected": p.connected,
+             "status": p.status.value, "role": p.role.value if p.role else None}
+            for p in game.players.values()
+        ]
+    else:
+        players = [
+            {"id": p.id, "name": p.name, "is_host": p.is_host, "connected": p.connected,
+             "status": p.status.value}
+            for p in game.players.values()
+        ]
+    game.public_players_cache[include_roles] = players
+    return players
+
+
 def get_all_roles(game: GameModel) -> list[dict]:
-    """Get all player roles (for game end reveal)."""
-    return [
+    """Get all player roles (for game end reveal). Cached once the game has ended."""
+    if game.final_roles_cache is not None:
+        return game.final_roles_cache
+    roles = [
         {"id": p.id, "name": p.name, "role": p.role.value if p.role else None}
         for p in game.players.values()
     ]
+    if game.state == GameState.ENDED:
+        game.final_roles_cache = roles
+    return roles
+
+
+def end_game(game: GameModel, winner: str, reason: Optional[str] = None) -> dict:
+    """Move the game to ENDED and return the game_ended message to broadcast."""
+    game.state = GameState.ENDED
+    game.winner = winner
+    game.active_sabotage = None
+    payload = {"winner": winner}
+    if reason:
+        payload["reason"] = reason
+    payload["roles"] = get_all_roles(game)
+    return {"type": "game_ended", "payload": payload}
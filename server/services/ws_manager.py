@@ -2,7 +2,13 @@
 
 from fastapi import WebSocket
 from typing import Optional
-import json
+import asyncio
+import orjson
+
+
+def encode_message(message: dict) -> str:
+    """Encode a message as compact JSON text (clients JSON.parse text frames)."""
+    return orjson.dumps(message).decode()
 
 
 class ConnectionManager:
@@ -28,21 +34,39 @@ class ConnectionManager:
 
     async def broadcast_to_game(self, game_code: str, message: dict, exclude_player: Optional[str] = None):
         """Send message to all players in a game."""
-        if game_code not in self.active_connections:
+        # Encode once, not once per socket
+        await self._broadcast_text(game_code, encode_message(message), exclude_player)
+
+    async def broadcast_batch(self, game_code: str, messages: list[dict]):
+        """Send several messages to all players as one frame (a JSON array).
+
+        Clients unpack arrays and handle each message in order, so an event and the
+        game_ended it triggers go out in one send per socket.
+        """
+        if len(messages) == 1:
+            await self.broadcast_to_game(game_code, messages[0])
             return
+        await self._broadcast_text(game_code, orjson.dumps(messages).decode())
 
-        disconnected = []
-        for player_id, ws in self.active_connections[game_code].items():
-            if exclude_player and player_id == exclude_player:
-                continue
-            try:
-                await ws.send_json(message)
-            except Exception:
-                disconnected.append(player_id)
+    async def _broadcast_text(self, game_code: str, text: str, exclude_player: Optional[str] = None):
+        connections = self.active_connections.get(game_code)
+        if not connections:
+            return
 
-        # Clean up disconnected
-        for player_id in disconnected:
-            self.disconnect(game_code, player_id)
+        # Snapshot so joins/leaves during the sends don't disturb the iteration
+        targets = [
+            (player_id, ws) for player_id, ws in connections.items()
+            if not (exclude_player and player_id == exclude_player)
+        ]
+        # Send to everyone concurrently: a slow socket no longer delays the rest
+        results = await asyncio.gather(
+            *(ws.send_text(text) for _, ws in targets), return_exceptions=True
+        )
+
+        # Clean up disconnected (unless the player has already reconnected on a new socket)
+        for (player_id, ws), result in zip(targets, results):
+            if isinstance(result, Exception) and self.active_connections.get(game_code, {}).get(player_id) is ws:
+                self.disconnect(game_code, player_id)
 
     async def send_to_player(self, game_code: str, player_id: str, message: dict):
         """Send message to a specific player."""
@@ -52,7 +76,7 @@ class ConnectionManager:
         ws = self.active_connections[game_code].get(player_id)
         if ws:
             try:
-                await ws.send_json(message)
+                await ws.send_text(encode_message(message))
                 return True
             except Exception:
                 self.disconnect(game_code, player_id)
@@ -93,7 +93,12 @@ function connectWS() {
 
     ws.onmessage = (event) => {
         const msg = JSON.parse(event.data);
-        handleMessage(msg);
+        // Batched frames carry an array of messages, handled in order
+        if (Array.isArray(msg)) {
+            msg.forEach(handleMessage);
+        } else {
+            handleMessage(msg);
+        }
     };
 
     ws.onclose = () => {
@@ -130,9 +135,6 @@ function handleMessage(msg) {
         case 'game_started':
             handleGameStart(msg.payload);
             break;
-        case 'task_completed':
-            // Don't update progress bar in real-time - only visible during meetings
-            break;
         case 'meeting_called':
             handleMeetingStart(msg.payload);
             break;